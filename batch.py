@@ -0,0 +1,170 @@
+# batch.py
+#
+# Runs many episodes of the game or the puzzle without the display,
+# spread over a pool of processes, and reports on them all together.
+#
+# Invoke this through wumpus.py:
+#
+# python wumpus.py -g -b -n 1000
+#
+# Each episode has its own seed, config.myId plus the number of the
+# episode, so any one of them can be run again on its own with that
+# seed, and the results don't depend on how the episodes were shared
+# out between the processes. That goes, as near as it can, for the
+# time and memory too: the caches that the planners keep between
+# calls (see resetCaches()) are emptied before each episode, so none
+# gains from what its process ran before, and each process runs one
+# episode that isn't counted before it starts, so that Python's own
+# start-up costs (the first objects of each class, and so on) don't
+# land on whichever episode happens to be first. The peak memory of
+# an episode can still vary by up to a tenth or so from one run to
+# the next. The pattern databases saved on disk (see
+# patternDatabase.py) are kept too, so puzzle episodes load them
+# rather than build them once an earlier run, or the episode that
+# isn't counted, has saved them. Episodes don't sleep, draw anything
+# or print: Link's and the world's messages are thrown away, and all
+# that comes back from each one is its outcome, how many steps it
+# took, how long it took and the most memory it used.
+#
+# Written by: Max Butler
+
+import contextlib
+import multiprocessing
+import os
+import random
+import time
+import tracemalloc
+import config
+import utils
+import grid
+import distanceField
+import tour
+import mdp
+import visibility
+import patternDatabase
+from world import World
+from link import Link
+from puzzleWorld import PuzzleWorld
+
+# Run the game until it ends, or config.batchStepLimit steps. Returns
+# the outcome and the number of steps.
+def playGame():
+    gameWorld = World()
+    player = Link(gameWorld)
+    steps = 0
+    while not gameWorld.isEnded():
+        if steps == config.batchStepLimit:
+            return "STOPPED", steps
+        gameWorld.updateLink(player.makeMove())
+        gameWorld.updateWumpus()
+        steps += 1
+    return gameWorld.status.name, steps
+
+# Run the puzzle until it is solved, or config.batchStepLimit steps.
+def solvePuzzle():
+    puzzle = PuzzleWorld()
+    endState = PuzzleWorld()
+    steps = 0
+    while not puzzle.isSolved(endState):
+        if steps == config.batchStepLimit:
+            return "STOPPED", steps
+        puzzle.makeAMove(endState)
+        steps += 1
+    return puzzle.status.name, steps
+
+episodeTypes = {"game": playGame, "puzzle": solvePuzzle}
+
+# Empty the caches that the planners keep from one call to the next,
+# so that an episode doesn't gain from what the process ran before.
+def resetCaches():
+    grid.gridCache = {}
+    distanceField.fieldCache = None
+    tour.lastTour = None
+    mdp.policyCache = None
+    visibility.coneCache = {}
+    patternDatabase.databaseCache = {}
+
+# Run one episode in a worker. Returns (seed, outcome, steps, seconds,
+# peak bytes), the peak being None if config.batchTraceMemory is off.
+def runEpisode(task):
+    wType, seed = task
+    config.headless = True
+    resetCaches()
+    random.seed(seed)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        if config.batchTraceMemory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            outcome, steps = episodeTypes[wType]()
+        except Exception as err:
+            outcome, steps = "ERROR: " + type(err).__name__ + ": " + str(err), None
+        seconds = time.perf_counter() - start
+        peak = None
+        if config.batchTraceMemory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return seed, outcome, steps, seconds, peak
+
+# Run an episode of wType in a new worker and throw the result away.
+def warmUp(wType):
+    runEpisode((wType, config.myId))
+
+# Run count episodes of wType ("game" or "puzzle") over workers
+# processes, and return the results of runEpisode() in order of seed.
+def runBatch(wType, count, workers):
+    tasks = [(wType, config.myId + i) for i in range(count)]
+    # Enough episodes in each chunk that handing them out doesn't
+    # cost much, but not so many that one process is left with the
+    # slow ones at the end
+    chunk = max(1, count // (workers * 8))
+    with multiprocessing.Pool(workers, warmUp, (wType,)) as pool:
+        results = list(pool.imap_unordered(runEpisode, tasks, chunk))
+    results.sort()
+    return results
+
+# Mean and largest of values, ignoring None.
+def summarise(values):
+    values = [value for value in values if value is not None]
+    if not values:
+        return None, None
+    return sum(values) / len(values), max(values)
+
+# Print the report for results, which took seconds in all.
+def printReport(wType, results, seconds, workers):
+    print(f"{len(results)} {wType} episodes on {workers} processes in {seconds:.3f} s ({len(results) / seconds:.1f} per second)")
+
+    outcomes = {}
+    for result in results:
+        outcomes.setdefault(result[1], []).append(result[0])
+    for outcome in sorted(outcomes):
+        print(f"  {outcome}: {len(outcomes[outcome])}")
+
+    meanSteps, maxSteps = summarise([result[2] for result in results])
+    meanTime, maxTime = summarise([result[3] for result in results])
+    meanPeak, maxPeak = summarise([result[4] for result in results])
+    if meanSteps is not None:
+        print(f"Steps: mean {meanSteps:.1f}, max {maxSteps}")
+    print(f"Time per episode: mean {meanTime * 1000:.3f} ms, max {maxTime * 1000:.3f} ms")
+    if meanPeak is not None:
+        print(f"Peak memory per episode: mean {meanPeak / 1024 / 1024:.3f} MB, max {maxPeak / 1024 / 1024:.3f} MB")
+
+    # The seeds to run again to look at what went wrong
+    for outcome in sorted(outcomes):
+        if outcome != utils.State.WON.name:
+            print(f"Seeds that ended {outcome}: {outcomes[outcome]}")
+
+# Run count episodes of wType over workers processes (all of the
+# cores if it is None) and print the report.
+def main(wType, count, workers=None):
+    if count < 1:
+        print("A batch needs at least one episode (use -n <number>)")
+        return
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        print("A batch needs at least one process (use -j <number>)")
+        return
+    start = time.perf_counter()
+    results = runBatch(wType, count, workers)
+    printReport(wType, results, time.perf_counter() - start, workers)
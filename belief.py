@@ -0,0 +1,198 @@
+# belief.py
+#
+# What Link believes about the cells they haven't seen, when
+# config.partialVisibility is set.
+#
+# For each kind of thing (pits, Wumpus and gold) there is a layer
+# giving the chance that every cell holds one. A cell that has been
+# seen is known for certain. For the rest, the percepts that Link has
+# had (see World.percepts()) are the evidence: a cell next to one
+# where there was no breeze can't have a pit, and a cell next to one
+# where there was can, all the more so the fewer of the other cells
+# around the breeze might be the cause.
+#
+# As in an occupancy grid, cells are treated as independent. The
+# chance of a cell is its prior, from how many of the thing there are
+# in the world, updated in log odds by each percept next to it. A
+# percept at b makes the cell c more likely by
+#
+#   1 / P(percept at b without c) = 1 / (1 - product of (1 - P(m)))
+#
+# over the other neighbours m of b, worked out from what is known of
+# them (and their prior otherwise). When a cell becomes known, the
+# only cells whose chance can change are those within two moves of it,
+# so each update works that neighbourhood out again, as NumPy
+# operations over a handful of cells, and the rest of the grid is
+# left alone.
+#
+# Link then plans with the cost of entering a cell raised by the
+# chance that it holds a pit or a Wumpus (see costs()).
+#
+# Written by: Max Butler
+
+import config
+from utils import numpy
+
+# The chances for one kind of thing.
+class Layer():
+
+    # neighbours is the (4, size + 1) array of Belief. count is how
+    # many of the thing there are, for the prior.
+    def __init__(self, neighbours, count):
+        size = neighbours.shape[1] - 1
+        self.neighbours = neighbours
+        self.prior = min(max(count / size, 1e-6), 1 - 1e-6)
+        self.priorOdds = numpy.log(self.prior / (1 - self.prior))
+        # Whether each cell is known, and if so whether it holds the
+        # thing. The extra cell at the end stands for off the grid,
+        # and is known to be empty.
+        self.known = numpy.zeros(size + 1, dtype=bool)
+        self.known[size] = True
+        self.present = numpy.zeros(size + 1, dtype=bool)
+        # The percept at each cell: 1 if it was felt, 0 if it wasn't,
+        # and -1 if Link hasn't been there, or it is out of date.
+        self.felt = numpy.full(size + 1, -1, dtype=numpy.int8)
+        self.probability = numpy.full(size + 1, self.prior)
+        self.probability[size] = 0
+        # Every cell that has been changed since the last reset()
+        self.touched = set()
+
+    # The chance of each of cells if nothing more was known about it.
+    def chances(self, cells):
+        return numpy.where(self.known[cells], self.present[cells], self.prior)
+
+    # Learn whether each of cells holds the thing. Returns the cells
+    # that changed.
+    def see(self, cells, present):
+        new = ~self.known[cells] | (self.present[cells] != present)
+        changed = cells[new]
+        if changed.size:
+            # Something that has gone (gold that was looted) makes the
+            # percepts around it out of date
+            gone = changed[self.known[changed] & self.present[changed]]
+            if gone.size:
+                around = self.neighbours[:, gone].ravel()
+                self.felt[around[around < self.known.size - 1]] = -1
+            self.known[changed] = True
+            self.present[changed] = present[new]
+        return changed
+
+    # Take in whether the percept was felt at cell. Returns the cells
+    # that changed.
+    def feel(self, cell, percept):
+        changed = [cell] if self.felt[cell] != percept else []
+        self.felt[cell] = percept
+        if not percept:
+            around = self.neighbours[:, cell]
+            around = around[~self.known[around]]
+            self.known[around] = True
+            self.present[around] = False
+            changed.extend(around)
+        return numpy.array(changed, dtype=numpy.intp)
+
+    # Work out the chances again for the cells within two moves of
+    # changed. Returns the cells that were worked out.
+    def refresh(self, changed):
+        if changed.size == 0:
+            return changed
+        neighbours = self.neighbours
+        around = neighbours[:, changed].ravel()
+        cells = numpy.unique(numpy.concatenate((changed, around, neighbours[:, around].ravel())))
+        cells = cells[cells < self.known.size - 1]
+        self.touched.update(cells.tolist())
+
+        known = cells[self.known[cells]]
+        self.probability[known] = self.present[known]
+        unknown = cells[~self.known[cells]]
+        if unknown.size == 0:
+            return cells
+
+        # The cells next to each unknown cell, and the cells next to
+        # each of those, which include the unknown cell itself
+        sources = neighbours[:, unknown]
+        others = (1 - self.chances(neighbours[:, sources])).prod(axis=0) / (1 - self.prior)
+        others = numpy.clip(others, 0, 1)
+        felt = self.felt[sources] == 1
+        with numpy.errstate(divide='ignore'):
+            evidence = numpy.where(felt, -numpy.log1p(-others), 0.0)
+        logOdds = self.priorOdds + evidence.sum(axis=0)
+        # Cells with no percepts next to them are left exactly at the
+        # prior, rather than what rounding makes of it
+        with numpy.errstate(over='ignore'):
+            self.probability[unknown] = numpy.where(felt.any(axis=0), 1 / (1 + numpy.exp(-logOdds)), self.prior)
+        return cells
+
+    # Forget everything about the cells that have been changed, for
+    # things that move. Returns the cells that were forgotten.
+    def reset(self):
+        cells = numpy.fromiter(self.touched, dtype=numpy.intp, count=len(self.touched))
+        self.known[cells] = False
+        self.present[cells] = False
+        self.felt[cells] = -1
+        self.probability[cells] = self.prior
+        self.touched = set()
+        return cells
+
+class Belief():
+
+    def __init__(self, grid):
+        self.grid = grid
+        size = grid.size
+        # The neighbour tables of grid, with moves off the grid going
+        # to the extra cell, size, whose neighbours are itself.
+        neighbours = numpy.full((len(grid.neighbours), size + 1), size, dtype=numpy.intp)
+        for i, (direction, table) in enumerate(grid.neighbours):
+            table = numpy.array(table, dtype=numpy.intp)
+            neighbours[i, :size] = numpy.where(table >= 0, table, size)
+        self.pits = Layer(neighbours, config.numberOfPits)
+        self.wumpus = Layer(neighbours, config.numberOfWumpus)
+        self.gold = Layer(neighbours, config.numberOfGold)
+
+        # What the planners use, kept up to date for the cells that
+        # change rather than worked out for the whole grid each time:
+        # the cost of entering each cell (see costs()), the cells that
+        # are certain to lose the game, and the unseen cells that the
+        # glitter points to.
+        self.stepCosts = [1 + config.riskWeight * min(self.pits.prior + self.wumpus.prior, 1)] * size
+        self.dangerous = set()
+        self.likelyGold = set()
+
+    # Take in what Link has seen and sensed at cell: visible, pits,
+    # wumpus and golds are as World.observe() gives them, and percepts
+    # as World.percepts(). Link's own cell is always in view.
+    def update(self, cell, visible, pits, wumpus, golds, percepts):
+        changed = []
+        # The Wumpus may have moved since Link last saw them
+        if config.dynamic:
+            changed.append(self.wumpus.reset())
+        cells = numpy.fromiter(visible, dtype=numpy.intp, count=len(visible))
+        windy, smelly, glitter = percepts
+        for layer, things, percept in ((self.pits, pits, windy), (self.wumpus, wumpus, smelly), (self.gold, golds, glitter)):
+            present = numpy.fromiter((seen in things for seen in visible), dtype=bool, count=len(visible))
+            seen = layer.see(cells, present)
+            felt = layer.feel(cell, int(percept))
+            changed.append(layer.refresh(numpy.concatenate((seen, felt))))
+        self.updatePlanning(numpy.unique(numpy.concatenate(changed)))
+
+    # The cost of entering cells is one move plus config.riskWeight
+    # times the chance that it loses the game.
+    def updatePlanning(self, cells):
+        if cells.size == 0:
+            return
+        risk = numpy.minimum(self.pits.probability[cells] + self.wumpus.probability[cells], 1)
+        gold = self.gold
+        likely = ~gold.known[cells] & (gold.probability[cells] > gold.prior)
+        for cell, cellRisk, cellLikely in zip(cells.tolist(), risk.tolist(), likely.tolist()):
+            self.stepCosts[cell] = 1 + config.riskWeight * cellRisk
+            if cellRisk >= 1:
+                self.dangerous.add(cell)
+            else:
+                self.dangerous.discard(cell)
+            if cellLikely:
+                self.likelyGold.add(cell)
+            else:
+                self.likelyGold.discard(cell)
+
+    # The cost of entering each cell, as a list.
+    def costs(self):
+        return self.stepCosts
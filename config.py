@@ -26,15 +26,22 @@ headless = False
 # If dynamic is True, then the Wumpus will move.
 dynamic = False
 
-# Control observability --- NOT YET IMPLEMENTED
+# Control observability
 #
 # If partialVisibility is True, Link will only see part of the
-# environment.
+# environment: a cone in the direction they last moved in.
 partialVisibility = False
 #
-# The limits of visibility when visibility is partial
+# The limits of visibility when visibility is partial: how far to
+# each side and how far ahead Link can see
 sideLimit = 1
 forwardLimit = 5
+#
+# When visibility is partial, how much Link pays to enter a cell that
+# is certain to hold a pit or a Wumpus, in moves, relative to one that
+# is certain not to (see belief.py). Cells that might hold one cost
+# in proportion.
+riskWeight = 10
 
 # Control determinism
 #
@@ -46,9 +53,61 @@ nonDeterministic = False
 # intended action:
 directionProbability = 0.8
 
+# The Markov decision process that Link's policy is worked out from
+# when they are nondeterministic (see mdp.py): what the gold, falling
+# in a pit or meeting a Wumpus, and each move are worth, how much
+# later rewards are discounted, and how small the largest change in
+# value has to get before value iteration stops.
+goldReward = 100
+lossReward = -100
+moveReward = -1
+discount = 0.99
+valueTolerance = 1e-4
+
+# How many times a plan is replayed to see how likely it is to work
+# when Link is nondeterministic (see robustness.py).
+robustnessSamples = 2000
+
+# The transposition table used by IDA* in the puzzle: the number of
+# states it can hold, and which entries are kept when it is full,
+# either "lru" (the most recently used) or "depth" (those nearest the
+# start).
+transpositionTableSize = 1000000
+transpositionReplacement = "lru"
+
+# Pattern databases for the puzzle heuristic: the directory they are
+# saved in between runs (relative to the directory the code is in),
+# and the largest pairwise table (in entries, the square of the number
+# of cells) that will be built.
+patternDatabaseDirectory = "pdb"
+pairwiseTableLimit = 250000
+
+# Link plans the order to visit the gold in exactly when there are
+# at most this many, and heuristically when there are more.
+exactTourLimit = 10
+
+# The most memory, in bytes, that Link's cached distance fields can
+# take up before the least recently used are thrown away.
+distanceFieldBudget = 64 * 1024 * 1024
+
 # How far away can the Wumpus sense Link.
 senseDistance = 5
 
+# How many ticks ahead the danger map of where the Wumpus might be
+# looks (see threat.py).
+threatHorizon = 10
+
+# When Link plans around the moving Wumpus (see spaceTime.py), a cell
+# is kept clear at a given tick if the chance of a Wumpus being there
+# is more than this.
+reservationThreshold = 0.05
+
+# Batches of episodes run with wumpus.py -b (see batch.py): the most
+# steps an episode can take before it is stopped, and whether the peak
+# memory of each episode is measured (which slows them down).
+batchStepLimit = 10000
+batchTraceMemory = True
+
 # Control images
 #
 # If useImage is True, then we use images for Link, Wumpus and
@@ -0,0 +1,192 @@
+# dStarLite.py
+#
+# Incremental replanning for Link when the Wumpus move (D* Lite, from
+# Koenig and Likhachev, "D* Lite", AAAI 2002).
+#
+# In the dynamic game the Wumpus move every tick, which changes which
+# cells Link can enter, and a plan made at the start of the tick may
+# walk straight into one of them. Rather than searching from scratch
+# every tick, D* Lite keeps the results of its last search and only
+# repairs the part of them affected by the cells whose occupancy
+# changed.
+#
+# The search runs backwards, from the goal cells (all of the gold) to
+# Link, so that the costs it keeps (g) are distances to the nearest
+# gold and stay valid as Link moves. rhs is the one-step lookahead
+# value of g. Cells where the two differ are "inconsistent", and are
+# the only ones kept on the queue.
+#
+# Written by: Max Butler
+
+import heapq
+import itertools
+
+infinity = float('inf')
+
+class DStarLite():
+
+    # goals and blocked are sets of cells of grid, and start is Link's
+    # cell.
+    def __init__(self, grid, goals, blocked, start):
+        self.grid = grid
+        self.goals = frozenset(goals)
+        self.blocked = set(blocked)
+        self.start = start
+        self.last = start
+        self.km = 0
+
+        self.g = {}
+        self.rhs = {}
+
+        # The queue of inconsistent cells. Entries are only removed
+        # lazily: queued holds the current key of every cell that
+        # should be on the queue, and anything else that is popped is
+        # ignored.
+        self.queue = []
+        self.queued = {}
+        self.counter = itertools.count()
+
+        for goal in self.goals:
+            self.rhs[goal] = 0
+            self.push(goal, self.calculateKey(goal))
+        self.computeShortestPath()
+
+    # Manhattan distance from Link to cell.
+    def heuristic(self, cell):
+        xOf = self.grid.xOf
+        yOf = self.grid.yOf
+        return abs(xOf[cell] - xOf[self.start]) + abs(yOf[cell] - yOf[self.start])
+
+    def neighbours(self, cell):
+        for direction, table in self.grid.neighbours:
+            child = table[cell]
+            if child >= 0:
+                yield direction, child
+
+    # The cost of a move between neighbouring cells. Moves are
+    # reversible, so this is the same both ways round.
+    def cost(self, a, b):
+        if a in self.blocked or b in self.blocked:
+            return infinity
+        return 1
+
+    def calculateKey(self, cell):
+        best = min(self.g.get(cell, infinity), self.rhs.get(cell, infinity))
+        return (best + self.heuristic(cell) + self.km, best)
+
+    #
+    # The queue
+    #
+
+    def push(self, cell, key):
+        self.queued[cell] = key
+        heapq.heappush(self.queue, (key, next(self.counter), cell))
+
+    # Throw away entries at the top of the queue that are out of date.
+    def discardStale(self):
+        while self.queue:
+            key, count, cell = self.queue[0]
+            if self.queued.get(cell) == key:
+                return
+            heapq.heappop(self.queue)
+
+    def topKey(self):
+        self.discardStale()
+        if self.queue:
+            return self.queue[0][0]
+        return (infinity, infinity)
+
+    #
+    # The search
+    #
+
+    # The lookahead value of cell: the best it can do through one of
+    # its neighbours.
+    def lookahead(self, cell):
+        if cell in self.goals:
+            return 0
+        best = infinity
+        g = self.g
+        for direction, child in self.neighbours(cell):
+            value = self.cost(cell, child) + g.get(child, infinity)
+            if value < best:
+                best = value
+        return best
+
+    def updateVertex(self, cell):
+        consistent = self.g.get(cell, infinity) == self.rhs.get(cell, infinity)
+        if not consistent:
+            self.push(cell, self.calculateKey(cell))
+        elif cell in self.queued:
+            del self.queued[cell]
+
+    def computeShortestPath(self):
+        g = self.g
+        rhs = self.rhs
+        while self.topKey() < self.calculateKey(self.start) or rhs.get(self.start, infinity) != g.get(self.start, infinity):
+            oldKey, count, cell = heapq.heappop(self.queue)
+            del self.queued[cell]
+            newKey = self.calculateKey(cell)
+
+            if oldKey < newKey:
+                # Link has moved since this was queued
+                self.push(cell, newKey)
+
+            elif g.get(cell, infinity) > rhs.get(cell, infinity):
+                # Overconsistent: the cell got cheaper
+                g[cell] = rhs[cell]
+                for direction, parent in self.neighbours(cell):
+                    if parent not in self.goals:
+                        value = self.cost(parent, cell) + g[cell]
+                        if value < rhs.get(parent, infinity):
+                            rhs[parent] = value
+                            self.updateVertex(parent)
+
+            else:
+                # Underconsistent: the cell got more expensive, so
+                # anything that relied on it needs to look again
+                oldG = g.get(cell, infinity)
+                g[cell] = infinity
+                for direction, parent in itertools.chain(self.neighbours(cell), [(None, cell)]):
+                    if parent not in self.goals and (parent == cell or rhs.get(parent, infinity) == self.cost(parent, cell) + oldG):
+                        rhs[parent] = self.lookahead(parent)
+                    self.updateVertex(parent)
+
+    #
+    # Keeping up with the world
+    #
+
+    # Link has moved to start.
+    def moveStart(self, start):
+        if start != self.start:
+            self.start = start
+            self.km += self.heuristic(self.last)
+            self.last = start
+
+    # The blocked cells are now blocked. Only the cells that changed,
+    # and their neighbours, are touched.
+    def updateBlocked(self, blocked):
+        changed = self.blocked.symmetric_difference(blocked)
+        if not changed:
+            return
+        self.blocked = set(blocked)
+        for cell in changed:
+            for direction, neighbour in itertools.chain(self.neighbours(cell), [(None, cell)]):
+                if neighbour not in self.goals:
+                    self.rhs[neighbour] = self.lookahead(neighbour)
+                self.updateVertex(neighbour)
+        self.computeShortestPath()
+
+    # The direction of the first move along a shortest path to the
+    # nearest goal, or None if no goal can be reached.
+    def nextMove(self):
+        if self.g.get(self.start, infinity) == infinity:
+            return None
+        best = None
+        bestValue = infinity
+        for direction, child in self.neighbours(self.start):
+            value = self.cost(self.start, child) + self.g.get(child, infinity)
+            if value < bestValue:
+                best = direction
+                bestValue = value
+        return best
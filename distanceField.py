@@ -0,0 +1,95 @@
+# distanceField.py
+#
+# Distance fields for static layouts.
+#
+# A distance field for a goal cell is the number of moves from every
+# cell of the grid to the goal, found with one breadth first search
+# back from the goal over the cells that can be entered. Once we have
+# it, the shortest path to the goal from anywhere is found by
+# repeatedly stepping to the neighbour that is one move closer, which
+# is just array lookups.
+#
+# Pits never move, and in the static game neither do the Wumpus, so
+# the same fields can be used for every plan. They are kept in a cache
+# keyed by the layout (the grid and the blocked cells) and the goal.
+# Each field is a flat array of ints, and once the fields take up more
+# than config.distanceFieldBudget bytes, the least recently used are
+# thrown away.
+#
+# Written by: Max Butler
+
+from array import array
+from collections import deque
+from collections import OrderedDict
+import config
+
+# The number of moves from every cell of grid to goal, or -1 for cells
+# that can't reach it, avoiding blocked cells. Moves in the grid can
+# be undone, so the neighbours of a cell are also the cells that lead
+# to it.
+def distanceTable(grid, goal, blocked=()):
+    distances = array('i', [-1]) * grid.size
+    distances[goal] = 0
+    queue = deque([goal])
+    neighbours = [table for direction, table in grid.neighbours]
+    while queue:
+        cell = queue.popleft()
+        step = distances[cell] + 1
+        for table in neighbours:
+            child = table[cell]
+            if child >= 0 and distances[child] < 0 and child not in blocked:
+                distances[child] = step
+                queue.append(child)
+    return distances
+
+# The directions that lead from cell to the goal of field, or None if
+# cell can't reach it.
+def pathFrom(grid, field, cell):
+    if field[cell] < 0:
+        return None
+    path = []
+    while field[cell] > 0:
+        target = field[cell] - 1
+        for direction, table in grid.neighbours:
+            child = table[cell]
+            if child >= 0 and field[child] == target:
+                path.append(direction)
+                cell = child
+                break
+    return path
+
+class DistanceFieldCache():
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.fields = OrderedDict()
+        self.used = 0
+
+    # The distance field for goal on grid when blocked cells can't be
+    # entered. blocked should be a frozenset, since it is part of the
+    # key.
+    def getField(self, grid, blocked, goal):
+        key = (grid.width, grid.height, blocked, goal)
+        field = self.fields.get(key)
+        if field is not None:
+            self.fields.move_to_end(key)
+            return field
+
+        field = distanceTable(grid, goal, blocked)
+        self.fields[key] = field
+        self.used += field.itemsize * len(field)
+        # Always keep the field we just made, even if it is over budget
+        # on its own.
+        while self.used > self.budget and len(self.fields) > 1:
+            oldKey, oldField = self.fields.popitem(last=False)
+            self.used -= oldField.itemsize * len(oldField)
+        return field
+
+# The cache shared by all the planners, made when it is first needed.
+fieldCache = None
+
+def getField(grid, blocked, goal):
+    global fieldCache
+    if fieldCache is None:
+        fieldCache = DistanceFieldCache(config.distanceFieldBudget)
+    return fieldCache.getField(grid, frozenset(blocked), goal)
@@ -0,0 +1,105 @@
+# grid.py
+#
+# A compact representation of the grid for the planners to search
+# over.
+#
+# Each location is a single integer, its cell id:
+#
+#   cell = y * width + x
+#
+# and the neighbours of every cell are worked out once, when the grid
+# is created, and kept in one flat array per direction. This means
+# that expanding a node in a search is a few array lookups, rather
+# than creating Pose and Node objects and comparing them with __eq__.
+#
+# Conversion between cells and poses only happens at the edges, when
+# a search is started and when its plan is handed back.
+#
+# Written by: Max Butler
+
+from array import array
+from utils import Pose
+from utils import Directions
+
+# The order in which moves are tried, which is the order that
+# World.getActions() has always used.
+moveOrder = (Directions.EAST, Directions.WEST, Directions.NORTH, Directions.SOUTH)
+
+class Grid():
+
+    def __init__(self, width, height, moveDeltas):
+        self.width = width
+        self.height = height
+        self.size = width * height
+
+        # Coordinates of every cell, so that the heuristics don't need
+        # to use divmod.
+        self.xOf = array('i', range(width)) * height
+        self.yOf = array('i')
+        for y in range(height):
+            self.yOf.extend(array('i', [y]) * width)
+
+        # For each direction, the cell that a move from each cell
+        # leads to, or -1 if the move would leave the grid. Each table
+        # is the list of cell ids shifted along by the change in cell
+        # id, which is quicker to build than adding to every element.
+        cells = array('i', range(self.size))
+        self.neighbours = []
+        for direction in moveOrder:
+            dx, dy = moveDeltas[direction]
+            shift = dx + dy * width
+            if shift > 0:
+                table = cells[shift:] + array('i', [-1]) * shift
+            else:
+                table = array('i', [-1]) * -shift + cells[:self.size + shift]
+            # Moves off the top or bottom fall off the end of the
+            # table, but moves off the sides wrap onto the next row.
+            if dx == 1:
+                table[width - 1::width] = array('i', [-1]) * height
+            elif dx == -1:
+                table[0::width] = array('i', [-1]) * height
+            self.neighbours.append((direction, table))
+
+    # Convert a pose to a cell and back.
+    def toCell(self, pose):
+        return pose.y * self.width + pose.x
+
+    def toPose(self, cell):
+        return Pose(self.xOf[cell], self.yOf[cell])
+
+    def inBounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    # A successor function for search.py, where the cells in blocked
+    # cannot be entered.
+    def successorFunction(self, blocked):
+        neighbours = self.neighbours
+
+        def successors(cell):
+            children = []
+            for direction, table in neighbours:
+                child = table[cell]
+                if child >= 0 and child not in blocked:
+                    children.append((direction, child))
+            return children
+
+        return successors
+
+    # Manhattan distance from a cell to goal, for the informed
+    # searches.
+    def manhattan(self, goal):
+        xOf = self.xOf
+        yOf = self.yOf
+        goalX = xOf[goal]
+        goalY = yOf[goal]
+        return lambda cell: abs(xOf[cell] - goalX) + abs(yOf[cell] - goalY)
+
+# Grids only depend on the dimensions and the way that moves change
+# the coordinates, so they are built once and shared.
+gridCache = {}
+
+def getGrid(width, height, moveDeltas):
+    key = (width, height, tuple(moveDeltas[direction] for direction in moveOrder))
+    if key not in gridCache:
+        gridCache[key] = Grid(width, height, moveDeltas)
+    return gridCache[key]
@@ -0,0 +1,192 @@
+# jumpPoint.py
+#
+# Jump point search for Link, for large grids that are mostly open.
+#
+# On a grid where every move costs the same, there are usually a huge
+# number of shortest paths between two cells, which only differ in the
+# order that the moves are made in, and A* expands the cells along all
+# of them. Jump point search only follows one order, "canonical"
+# paths, which make their horizontal moves before their vertical ones
+# and only turn back to horizontal when an obstacle forces them to.
+# Rather than stopping at every cell, a search along a straight line
+# runs until it reaches a cell where something interesting happens (a
+# jump point):
+#
+# - the goal;
+# - when moving vertically, a cell with a "forced" neighbour to the
+#   side: one that can't be reached any other way as cheaply, because
+#   the cell behind it is blocked;
+# - when moving horizontally, a cell from which a vertical search finds
+#   a jump point.
+#
+# Only the jump points go on the A* frontier, and the cost of a jump is
+# its length, so the paths found are still the shortest.
+#
+# This is the four-connected version of Harabor and Grastien, "Online
+# Graph Pruning for Pathfinding on Grid Maps", AAAI 2011.
+#
+# Written by: Max Butler
+
+from utils import Directions
+import search
+
+horizontal = (Directions.EAST, Directions.WEST)
+vertical = (Directions.NORTH, Directions.SOUTH)
+opposite = {Directions.EAST: Directions.WEST, Directions.WEST: Directions.EAST,
+            Directions.NORTH: Directions.SOUTH, Directions.SOUTH: Directions.NORTH}
+
+# Search from start to goal (cells of grid) avoiding the cells in
+# blocked. Returns the list of directions to move in, as
+# search.findPath() does, or None if there is no path.
+def jumpPointSearch(grid, blocked, start, goal):
+    if start == goal:
+        return []
+
+    # Moves are numbered by their place in grid.neighbours, since
+    # hashing a number is much quicker than hashing a Directions.
+    moves = [direction for direction, table in grid.neighbours]
+    tables = [table for direction, table in grid.neighbours]
+    east, west, north, south = [moves.index(direction) for direction in horizontal + vertical]
+    back = [moves.index(opposite[direction]) for direction in moves]
+    eastTable = tables[east]
+    westTable = tables[west]
+
+    free = bytearray([1]) * grid.size
+    for cell in blocked:
+        free[cell] = 0
+
+    # Vertical jumps are made from every cell that a horizontal jump
+    # passes, so they need to be quick. The grid is copied out into
+    # one array column by column, and for each vertical move the cells
+    # where a jump stops (the goal, and cells with a forced neighbour)
+    # are marked in another. A vertical jump is then two calls to
+    # find() over a stretch of a column: one for the next obstacle, and
+    # one for the next mark before it.
+    width = grid.width
+    height = grid.height
+    xOf = grid.xOf
+    yOf = grid.yOf
+
+    def byColumn(cells):
+        copy = bytearray(grid.size)
+        for x in range(width):
+            copy[x * height:(x + 1) * height] = cells[x::width]
+        return copy
+
+    columns = byColumn(free)
+
+    # Moving vertically, a side cell is forced if the cell behind it is
+    # blocked, so the cells to mark are found from the blocked cells
+    # rather than by looking at every cell.
+    marks = [None] * len(moves)
+    for move in (north, south):
+        step = tables[move]
+        stops = bytearray(grid.size)
+        stops[goal] = 1
+        for cell in blocked:
+            side = step[cell]
+            if side >= 0 and free[side]:
+                across = eastTable[side]
+                if across >= 0:
+                    stops[across] = 1
+                across = westTable[side]
+                if across >= 0:
+                    stops[across] = 1
+        marks[move] = byColumn(stops)
+
+    # Which way along a column each vertical move goes.
+    increasing = [height > 1 and table[0] >= 0 for table in tables]
+
+    # Each jump returns the jump point it reaches and how far away it
+    # is, or None if it runs into an obstacle or the edge first.
+    def jumpVertical(cell, move):
+        stops = marks[move]
+        y = yOf[cell]
+        top = xOf[cell] * height
+        here = top + y
+        if increasing[move]:
+            end = columns.find(0, here + 1, top + height)
+            if end < 0:
+                end = top + height
+            found = stops.find(1, here + 1, end)
+        else:
+            end = columns.rfind(0, top, here)
+            found = stops.rfind(1, end + 1 if end >= 0 else top, here)
+        if found < 0:
+            return None
+        foundY = found - top
+        return cell + (foundY - y) * width, abs(foundY - y)
+
+    def jumpHorizontal(cell, move):
+        step = tables[move]
+        distance = 0
+        while True:
+            cell = step[cell]
+            if cell < 0 or not free[cell]:
+                return None
+            distance += 1
+            if cell == goal or jumpVertical(cell, north) or jumpVertical(cell, south):
+                return cell, distance
+
+    # The jumps to make from cell, having arrived by making move (None
+    # at the start).
+    def jumps(cell, move):
+        if move is None:
+            return [(east, jumpHorizontal(cell, east)), (west, jumpHorizontal(cell, west)),
+                    (north, jumpVertical(cell, north)), (south, jumpVertical(cell, south))]
+        if move == east or move == west:
+            return [(move, jumpHorizontal(cell, move)),
+                    (north, jumpVertical(cell, north)), (south, jumpVertical(cell, south))]
+        found = [(move, jumpVertical(cell, move))]
+        behind = tables[back[move]]
+        for side, turn in ((eastTable[cell], east), (westTable[cell], west)):
+            if side >= 0 and free[side] and not free[behind[side]]:
+                found.append((turn, jumpHorizontal(cell, turn)))
+        return found
+
+    # A* over the jump points. Which jumps can follow depends on the
+    # move a cell was reached by, so states are (cell, move).
+    heuristic = grid.manhattan(goal)
+    startState = (start, None)
+    parents = {startState: None}
+    costs = {startState: 0}
+    frontier = search.PriorityFrontier()
+    frontier.push((startState, 0), (heuristic(start), heuristic(start)))
+
+    while frontier:
+        state, g = frontier.pop()
+        if g > costs[state]:
+            continue
+
+        cell, move = state
+        if cell == goal:
+            return [moves[move] for move in recoverJumps(parents, state)]
+
+        for move, jump in jumps(cell, move):
+            if jump is None:
+                continue
+            child, distance = jump
+            childState = (child, move)
+            childCost = g + distance
+            if childCost >= costs.get(childState, childCost + 1):
+                continue
+            costs[childState] = childCost
+            parents[childState] = (state, move, distance)
+            h = heuristic(child)
+            frontier.push((childState, childCost), (childCost + h, h))
+
+    return None
+
+# Trace back from state to the start, filling in every move along each
+# jump.
+def recoverJumps(parents, state):
+    jumps = []
+    step = parents[state]
+    while step is not None:
+        state, move, distance = step
+        jumps.append((move, distance))
+        step = parents[state]
+    path = []
+    for move, distance in reversed(jumps):
+        path.extend([move] * distance)
+    return path
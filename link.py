@@ -14,9 +14,20 @@ import world
 import random
 import utils
 from utils import Directions
-from node import Node
-
-import heapq
+from utils import numpy
+import search
+import tour
+import distanceField
+import jumpPoint
+import wavefront
+import threat
+import spaceTime
+import mdp
+import robustness
+import visibility
+import belief
+import dStarLite
+import config
 
 class Link():
 
@@ -31,11 +42,39 @@ class Link():
         
         # path is set to empty
         self.path = []
+
+        # the incremental planner used when the Wumpus move
+        self.planner = None
+
+        # what Link has seen when they can only see part of the world,
+        # and what they believe about the rest
+        self.knownMap = None
+        self.belief = None
     
     ### methods ###
         
     def makeMove(self):
         # This is the function you need to define
+
+        # when Link can only see part of the world, plan over what they
+        # have seen so far
+        if config.partialVisibility:
+            return self.partialMove()
+
+        # when the Wumpus move, any path we made goes out of date every
+        # tick, so plan around where the Wumpus are going to be
+        if config.dynamic:
+            return self.spaceTimeMove()
+
+            # or repair the plan incrementally, treating the Wumpus as
+            # if they stay where they are
+            #return self.incrementalMove()
+
+        # when moves can go astray, follow a policy that allows for
+        # that rather than a fixed path
+        if config.nonDeterministic and utils.numpyAvailable:
+            return self.policyMove()
+
         # if we haven't created a path yet, run the chosen one
         if not self.path:
             
@@ -45,14 +84,20 @@ class Link():
             print("Link Location:", linkLoc)
             print("Gold Location:", goldLoc)
             
-            # Call the required search method:
+            # Plan a route that picks up all of the gold:
+            self.path = self.tourSearch(linkLoc)
+
+            # Or call the required search method to head for the first gold:
             #self.path = self.depthFirstSearch(linkLoc, goldLoc)
             #self.path = self.breadthFirstSearch(linkLoc, goldLoc)
             
             #self.path = self.uniformCostSearch(linkLoc, goldLoc)
             #self.path = self.greedySearch(linkLoc, goldLoc)
             #self.path = self.aStarSearch(linkLoc, goldLoc)
+            #self.path = self.jumpPointSearch(linkLoc, goldLoc)
+            #self.path = self.robustSearch(linkLoc, goldLoc)
             #self.path = self.depthLimitedSearch(linkLoc, goldLoc, 20)
+            #self.path = self.distanceFieldSearch(linkLoc, goldLoc)
             
             # path index is set to 0
             self.pathIndex = 0
@@ -93,6 +138,15 @@ class Link():
             # If there are no possible moves, return None or stay in place
             if not possibleMoves:
                 return None
+
+            # with NumPy, head for whichever gold is nearest going
+            # round the pits and Wumpus, rather than as the crow flies
+            if utils.numpyAvailable:
+                distances, moves = wavefront.distanceTransform(self.gameWorld)
+                reachable = [gold for gold in allGold if distances[gold.y, gold.x] > 0]
+                if reachable:
+                    nearest = min(reachable, key=lambda gold: distances[gold.y, gold.x])
+                    return wavefront.firstMove(moves, nearest)
         
         # if not at the same x coordinate, reduce the difference
         # try to move towards the gold, checking each direction for obstacles
@@ -138,298 +192,176 @@ class Link():
 
     
     ### SEARCH ALGORITHMS ###
+    # All of these hand over to the shared engine in search.py.
     def depthFirstSearch(self, start, goal):
         print("DFS started!")
+        return search.findPath(self.gameWorld, search.depthFirstSearch, start, goal)
 
-        # create a node object
-        node = Node(start, None, None)
-        
-        # goal test:
-        if node.isGoal(goal):
-            print("Start and end locations are the same")
-            return []
-        
-        frontiers = [node] 
-        explored = []        
-        
-        while frontiers:
-            
-            # LIFO queue
-            node = frontiers[-1]
-            frontiers = frontiers.pop()
-            
-            # for each action Link can take
-            for action in self.gameWorld.getActions(node.location):
-                child = self.createChildNode(node, action)
-                
-                # note, in the Node class we override the equals operator --- two nodes are equal if the location is the same (which means we can use "not in" here)
-                # check for goal
-                if child not in explored and child not in frontiers:
-                    if child.isGoal(goal):
-                        print("Found goal")
-                    
-                    # add the child to the frontiers list
-                    frontiers.append(child)
-            
-            # add the node to the explored list
-            explored.append(node)                        
-        
-        print("Failed to find a path")
-        return []
-    
     # just like DFS, but uses a FIFO queue
     def breadthFirstSearch(self, start, goal):
         print("BFS started!")
+        return search.findPath(self.gameWorld, search.breadthFirstSearch, start, goal)
 
-        node = Node(start, None, None)
-
-        # Goal test:
-        if node.isGoal(goal):
-            print("Start and end locations are the same")
-            return []
-
-        frontiers = [node]
-        explored = []    
-
-        while frontiers:
-            
-            # FIFO queue
-            node = frontiers[0]
-            node = frontiers.pop(0) 
-
-            # For each action Link can take
-            for action in self.gameWorld.getActions(node.location):
-                child = self.createChildNode(node, action)
-
-                # Check if child is in explored or frontiers
-                if child not in explored and child not in frontiers:
-                    # Check for goal
-                    if child.isGoal(goal):
-                        print("Found goal")
-
-                    frontiers.append(child)
-            
-            explored.append(node)                        
-
-        print("Failed to find a path")
-        return []
-    
     # similar to BFS, but uses a priority queue
     def uniformCostSearch(self, start, goal):
-        node = Node(start, None, None, 0)
-        
-        # goal test:
-        if node.isGoal(goal):
-            print("Start and end locations are the same")
-            return []
-        
-        frontiers = []
-        explored = {}
-        
-        # uses heapq to create a heap queue
-        heapq.heappush(frontiers, (0, node))
-        
-        while frontiers:
-            
-            # get the FIRST item from frontiers list
-            cost, node = heapq.heappop(frontiers)
-            
-            # check for goal
-            if node.isGoal(goal):
-                print("Found goal")
-                return self.recoverPlan(node)
-            
-            explored[node.location.x, node.location.y] = cost
-            
-            # for each action the vacuum can take
-            for action in self.gameWorld.getActions(node.location):
-                child = self.createChildNode(node, action)
-                child.pathCost = node.pathCost + 1
-                
-                # note, in the Node class we override the equals operator --- two nodes are equal if the location is the same (which means we can use "not in" here). 
-                if (child.location.x, child.location.y) not in explored or explored[(child.location.x, child.location.y)] > child.pathCost:
-                    heapq.heappush(frontiers, (child.pathCost, child))
-                    explored[(child.location.x, child.location.y)] = child.pathCost                        
-        
-        print("Failed to find a path")
-        return []
-    
+        return search.findPath(self.gameWorld, search.uniformCostSearch, start, goal)
+
     # similar to UCS, but uses a priority queue based on the heuristic value
     def greedySearch(self, start, goal):
-        node = Node(start, None, None, 0)
-        
-        # goal test:
-        if node.isGoal(goal):
-            print("Start and end locations are the same")
-            return []
-        
-        # uses heapq to create a heap queue - picks node with LOWEST heuristic value (this value is the closes path to the goal)
-        frontiers = []
-        heapq.heappush(frontiers, (utils.separation(start, goal), node))
-        
-        # makes explored into a set
-        explored = set()
-        
-        while frontiers:
-            
-            # get the FIRST item from the priority frontiers queue
-            _, node = heapq.heappop(frontiers)
-            
-            nodeLocation = (node.location.x, node.location.y)
-            
-            # check for goal
-            if node.isGoal(goal):
-                print("Found goal")
-                return self.recoverPlan(node)
-            
-            # mark node as explored
-            explored.add(nodeLocation)
-            
-            # for each action the vacuum can take
-            for action in self.gameWorld.getActions(node.location):
-                child = self.createChildNode(node, action)
-                childLocation = (child.location.x, child.location.y)
-
-                # If the child hasn't been explored, add it based on heuristic
-                if childLocation not in explored:
-                    
-                    # calculates the Euclidean distance between the child and the goal
-                    heuristic_value = utils.separation(child.location, goal)
-                    
-                    # adds the child node with its heuristic value to explored   
-                    heapq.heappush(frontiers, (heuristic_value, child))
-                    
-                    # adds child location to explored list
-                    explored.add(childLocation)                 
-        
-        print("Failed to find a path")
-        return []
-    
+        return search.findPath(self.gameWorld, search.greedySearch, start, goal)
+
     # similar to UCS and greedy, but avoids local minima and uses heuristics
     def aStarSearch(self, start, goal):
-        
-        node = Node(start, None, None, 0)
-        
-        # goal test:
-        if node.isGoal(goal):
-            print("Start and end locations are the same")
+        return search.findPath(self.gameWorld, search.aStarSearch, start, goal)
+
+    # like A*, but only stops at the cells where a path may need to
+    # turn (see jumpPoint.py), which on large open grids is a tiny
+    # fraction of the cells that A* expands
+    def jumpPointSearch(self, start, goal):
+        grid = self.gameWorld.grid()
+        path = jumpPoint.jumpPointSearch(grid, self.gameWorld.blockedCells(), grid.toCell(start), grid.toCell(goal))
+        if path is None:
+            print("Failed to find a path")
             return []
-        
-        frontiers = []
-        heapq.heappush(frontiers, (utils.separation(start, goal) + node.pathCost, node)) # uses heapq to create a heap queue - picks node with LOWEST heuristic value (this value is the closes path to the goal)
-        
-        explored = set()
-        
-        while frontiers:
-            _, node = heapq.heappop(frontiers) # get the FIRST item
-            
-            nodeLocation = (node.location.x, node.location.y)
-            
-            # check for goal
-            if node.isGoal(goal):
-                print("Found goal")
-                return self.recoverPlan(node)
-            
-            # mark as visited
-            explored.add(nodeLocation)
-            
-            # for each action the vacuum can take
-            for action in self.gameWorld.getActions(node.location):
-                child = self.createChildNode(node, action)
-                childLocation = (child.location.x, child.location.y)
-
-                # If the child hasn't been explored, add it based on heuristics
-                if childLocation not in explored:
-                    
-                    # calculates the Euclidean distance
-                    heuristic_value = utils.separation(child.location, goal)
-                    
-                    heapq.heappush(frontiers, (heuristic_value, child))
-                    explored.add(childLocation)              
-        
-        print("Failed to find a path")
-        return []
-    
+        return path
+
+    # plans a route to goal with several of the searches, and keeps the
+    # one that is most likely to get there when moves can go astray
+    # (see robustness.py)
+    def robustSearch(self, start, goal):
+        grid = self.gameWorld.grid()
+        losses = self.gameWorld.blockedCells()
+        candidates = [self.aStarSearch(start, goal), self.jumpPointSearch(start, goal),
+                      self.greedySearch(start, goal), self.distanceFieldSearch(start, goal)]
+        # and the route the policy for slippery moves would take
+        if utils.numpyAvailable:
+            policy = mdp.getPolicy(grid, losses, [grid.toCell(goal)])
+            candidates.append(mdp.policyPath(grid, policy, grid.toCell(start)))
+
+        plans = []
+        for plan in candidates:
+            if plan and plan not in plans:
+                plans.append(plan)
+        if not plans or not utils.numpyAvailable:
+            return plans[0] if plans else []
+
+        chance, moves, plan = robustness.rankPlans(grid, losses, {grid.toCell(goal)}, grid.toCell(start), plans)[0]
+        print("Most robust plan succeeds with probability", chance)
+        return plan
+
     # similar to DFS, but with a set depth limit
     def depthLimitedSearch(self, start, goal, depthLimit):
-        
-        # depth is set to 0 because this is the root node
-        node = Node(start, None, None, 0)
-        
-        # goal test:
-        if node.isGoal(goal):
-            print("Start and end locations are the same")
+        return search.findPath(self.gameWorld, search.depthLimitedSearch, start, goal, depthLimit)
+
+    # follows the cached distance field of goal (see distanceField.py),
+    # so that repeated plans to the same gold are just array lookups
+    def distanceFieldSearch(self, start, goal):
+        grid = self.gameWorld.grid()
+        field = distanceField.getField(grid, self.gameWorld.blockedCells(), grid.toCell(goal))
+        path = distanceField.pathFrom(grid, field, grid.toCell(start))
+        if path is None:
+            print("Failed to find a path")
             return []
-        
-        frontiers = [node] 
-        explored = []        
-        
-        while frontiers:
-            
-            # LIFO queue because this is DFS
-            node = frontiers.pop(0)
-            
-            if node.depth >= depthLimit:
-                print("depth limit reached. Depth Limit:" , depthLimit, "Location: ", node.location)
-                continue
-            
-            # for each action the vacuum can take
-            for action in self.gameWorld.getActions(node.location):
-                child = self.createChildNode(node, action) 
-                
-                child.depth = node.depth + 1
-                
-                # note, in the Node class we override the equals operator --- two nodes are equal if the location is the same (which means we can use "not in" here). 
-                if child not in explored and child not in frontiers:
-                    
-                    # check for goal
-                    if child.isGoal(goal):
-                        print("Found goal")
-                        path = self.recoverPlan(child)
-                    
-                    # add the child to the frontiers list
-                    frontiers.append(child)
-            
-            # add the node to the explored list
-            explored.append(node)     
-        
-        print("Failed to find a path")
-        return []
-    
-    ### methods that help the algorithms run ###
-    # creates a child node of the parent for the given direction
-    def createChildNode(self, parent, action):
-        if action == Directions.EAST:
-            return Node( utils.Pose(parent.location.x + 1, parent.location.y), parent, action)
-        if action == Directions.WEST:
-            return Node( utils.Pose(parent.location.x - 1, parent.location.y), parent, action)
-        if action == Directions.SOUTH:
-            return Node( utils.Pose(parent.location.x, parent.location.y + 1), parent, action)
-        if action == Directions.NORTH:
-            return Node( utils.Pose(parent.location.x, parent.location.y - 1), parent, action)
-        
-    # traces back from the goal node to the starting node - returns the path
-    def recoverPlan(self, node):
-        path = []
-        
-        while node.parent is not None:
-            path.append(node.action)
-            node = node.parent
-        
-        path.reverse()
-        
         return path
 
-    # recursive version of recoverPlan() - calls itself recursivley to trace back from the goal node to the starting node
-    def recoverPlanRecursive(self, node, plan):
-        if node.parent:            
-            self.recoverPlanRecursive(node.parent, plan)
-            plan.append(node.action)
-    
-    # defines how 2 nodes are compared for equality - useful for checking if a node has been visited or added to the frontiers
-    def __eq__(self, other):
-        return isinstance(other, Node) and self.location == other.location
+    # plans a route from start that picks up all of the gold, visiting
+    # it in the best order we can find (see tour.py)
+    def tourSearch(self, start):
+        grid = self.gameWorld.grid()
+        golds = [grid.toCell(gold) for gold in self.gameWorld.getGoldLocation()]
+        return tour.planTour(grid, self.gameWorld.blockedCells(), grid.toCell(start), golds)
+
+    # the next move towards the nearest gold, keeping the D* Lite
+    # search (see dStarLite.py) from one call to the next and only
+    # repairing it where the Wumpus have moved
+    def incrementalMove(self):
+        grid = self.gameWorld.grid()
+        golds = frozenset(grid.toCell(gold) for gold in self.gameWorld.getGoldLocation())
+        blocked = self.gameWorld.blockedCells()
+        start = grid.toCell(self.gameWorld.getLinkLocation())
+
+        # a new search is only needed when the gold changes
+        if self.planner is None or self.planner.goals != golds or self.planner.grid is not grid:
+            self.planner = dStarLite.DStarLite(grid, golds, blocked, start)
+        else:
+            self.planner.moveStart(start)
+            self.planner.updateBlocked(blocked)
+
+        return self.planner.nextMove()
+
+    # the first move of a plan that keeps out of the way of where the
+    # Wumpus may be over the next few ticks (see spaceTime.py), made
+    # again every tick as the Wumpus move
+    def spaceTimeMove(self):
+        grid = self.gameWorld.grid()
+        golds = [grid.toCell(gold) for gold in self.gameWorld.getGoldLocation()]
+        start = grid.toCell(self.gameWorld.getLinkLocation())
+        pits = frozenset(self.gameWorld.pitCells)
+        reserved = self.reservations()
+
+        # distances that go round the pits but ignore the Wumpus never
+        # overestimate, and the pits don't move so these are cached
+        fields = [distanceField.getField(grid, pits, gold) for gold in golds]
+        def heuristic(cell):
+            return min([field[cell] for field in fields if field[cell] >= 0], default=float('inf'))
+
+        plan = spaceTime.spaceTimeSearch(grid, pits, reserved, start, frozenset(golds), heuristic)
+        if plan:
+            return plan[0]
+
+        # if there is no safe way to the gold, at least keep out of the
+        # way for the next tick
+        for direction, table in grid.neighbours:
+            child = table[start]
+            if child >= 0 and child not in pits and child not in reserved[min(1, len(reserved) - 1)]:
+                return direction
+        return None
+
+    # the cells to keep clear after each of the next config.threatHorizon
+    # ticks: those where a Wumpus is likely to be
+    def reservations(self):
+        horizon = config.threatHorizon
+        # the Wumpus can only move one cell a tick, so keeping clear of
+        # the cells next to them is always safe for the next tick
+        grid = self.gameWorld.grid()
+        near = set(self.gameWorld.wumpusCells)
+        for cell in self.gameWorld.wumpusCells:
+            near.update(table[cell] for direction, table in grid.neighbours if table[cell] >= 0)
+
+        # after that, keep clear of where they are likely to be, or
+        # without NumPy just of the same cells
+        if utils.numpyAvailable:
+            danger = threat.threatField(self.gameWorld, horizon)
+            later = [set(numpy.flatnonzero(danger[t] > config.reservationThreshold).tolist()) for t in range(2, horizon + 1)]
+        else:
+            later = [near] * (horizon - 1)
+        return [set(self.gameWorld.wumpusCells), near] + later
+
+    # the best move from where Link is when moves don't always go where
+    # they are meant to, from a policy for the whole grid (see mdp.py)
+    # that is only worked out again when the gold or the Wumpus change
+    def policyMove(self):
+        grid = self.gameWorld.grid()
+        golds = [grid.toCell(gold) for gold in self.gameWorld.getGoldLocation()]
+        policy = mdp.getPolicy(grid, self.gameWorld.blockedCells(), golds)
+        move = policy[grid.toCell(self.gameWorld.getLinkLocation())]
+        if move < 0:
+            return None
+        return grid.neighbours[move][0]
 
-    # allows node objects to be used in the sets - hashes them based on their location
-    def __hash__(self):
-        return hash(self.location)
+    # the next move when Link can only see part of the world: update
+    # what Link knows with what is in view, and head for the nearest
+    # gold they know about, or to look somewhere new. With NumPy, what
+    # Link senses is used to steer them away from the cells that might
+    # hold a pit or a Wumpus, and towards those that might hold gold
+    def partialMove(self):
+        grid = self.gameWorld.grid()
+        if self.knownMap is None or self.knownMap.grid is not grid:
+            self.knownMap = visibility.KnownMap(grid)
+            self.belief = belief.Belief(grid) if utils.numpyAvailable else None
+        observation = self.gameWorld.observe()
+        self.knownMap.update(*observation)
+        cell = grid.toCell(self.gameWorld.getLinkLocation())
+        if self.belief is not None:
+            self.belief.update(cell, *observation, self.gameWorld.percepts())
+        return self.knownMap.nextMove(cell, self.belief)
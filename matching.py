@@ -0,0 +1,74 @@
+# matching.py
+#
+# Matching each Wumpus to a different goal cell as cheaply as
+# possible, for the puzzle planners (puzzleSolver.py) and the pattern
+# database heuristic (patternDatabase.py).
+#
+# Written by: Max Butler
+
+import itertools
+
+# The smallest total cost of matching each row of costs (a square
+# matrix) to a different column. For a handful of Wumpus it is
+# quickest to try every matching, beyond that we use the Hungarian
+# algorithm.
+def matchingCost(costs):
+    if len(costs) <= 4:
+        return min(sum(row[column] for row, column in zip(costs, columns)) for columns in itertools.permutations(range(len(costs))))
+    return sum(row[column] for row, column in zip(costs, hungarian(costs)))
+
+# The Hungarian algorithm. Given a square matrix of costs, returns the
+# column matched with each row so that the total cost is as small as
+# possible. Runs in O(n^3).
+#
+# This is the version that keeps a potential for each row (u) and
+# column (v) and adds one row at a time, growing a shortest path
+# from it to a free column.
+def hungarian(costs):
+    n = len(costs)
+    infinity = float('inf')
+    u = [0] * (n + 1)
+    v = [0] * (n + 1)
+    # rowOf[j] is the row matched with column j, and columns are
+    # numbered from 1 so that 0 can stand for the row being added.
+    rowOf = [0] * (n + 1)
+    way = [0] * (n + 1)
+
+    for row in range(1, n + 1):
+        rowOf[0] = row
+        column = 0
+        slack = [infinity] * (n + 1)
+        used = [False] * (n + 1)
+        while True:
+            used[column] = True
+            current = rowOf[column]
+            delta = infinity
+            nextColumn = 0
+            for j in range(1, n + 1):
+                if not used[j]:
+                    reduced = costs[current - 1][j - 1] - u[current] - v[j]
+                    if reduced < slack[j]:
+                        slack[j] = reduced
+                        way[j] = column
+                    if slack[j] < delta:
+                        delta = slack[j]
+                        nextColumn = j
+            for j in range(n + 1):
+                if used[j]:
+                    u[rowOf[j]] += delta
+                    v[j] -= delta
+                else:
+                    slack[j] -= delta
+            column = nextColumn
+            if rowOf[column] == 0:
+                break
+        # Flip the matching along the path back to the new row
+        while column:
+            previous = way[column]
+            rowOf[column] = rowOf[previous]
+            column = previous
+
+    assignment = [0] * n
+    for j in range(1, n + 1):
+        assignment[rowOf[j] - 1] = j - 1
+    return assignment
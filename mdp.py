@@ -0,0 +1,120 @@
+# mdp.py
+#
+# A policy for Link when moves don't always go where they are meant
+# to (config.nonDeterministic).
+#
+# With probability config.directionProbability Link moves the way
+# they choose. Otherwise the move slips: World.sideMove() works out a
+# cell at right angles to it, but World.updateLink() only moves Link
+# for a direction, so after a slip Link is still where they were. A
+# move off the edge of the grid also leaves Link where they are. So a
+# slip never takes Link anywhere they didn't choose, but it does cost
+# a move, and a fixed path that is followed move by move after one
+# heads off from the wrong cell. The policy instead says what to do
+# from wherever Link is.
+#
+# We treat the grid as a Markov decision process: the pits and the
+# Wumpus are absorbing states worth config.lossReward, the gold is an
+# absorbing state worth config.goldReward, and every move costs
+# config.moveReward. Value iteration then gives the value of every
+# cell, and the best move from every cell follows from that, so Link
+# only has to look up the cell they are in.
+#
+# The transitions are built from the neighbour tables of grid.py: for
+# each move and each way it can turn out, an array of the cell every
+# cell ends up in. One sweep of value iteration is then a few NumPy
+# operations over the whole grid.
+#
+# Policies are cached for each layout of the pits, Wumpus and gold.
+#
+# Written by: Max Butler
+
+import config
+from utils import numpy
+
+# For each direction, an array giving the cell that a move from every
+# cell ends up in, which is the cell itself for moves off the grid.
+def moveTables(grid):
+    cells = numpy.arange(grid.size)
+    results = {}
+    for direction, table in grid.neighbours:
+        table = numpy.array(table)
+        results[direction] = numpy.where(table >= 0, table, cells)
+    return results
+
+# For each move of grid.neighbours, the (probability, cells) pairs for
+# the ways it can turn out, where cells[c] is where a move from c
+# ends up: where it was meant to go, or c itself if it slips.
+def transitions(grid):
+    results = moveTables(grid)
+    stay = numpy.arange(grid.size)
+    intended = config.directionProbability
+    outcomes = []
+    for direction, table in grid.neighbours:
+        outcomes.append([(intended, results[direction]),
+                         (1 - intended, stay)])
+    return outcomes
+
+# Value iteration over grid, where losses are the cells with a pit or
+# a Wumpus and golds are the cells with gold.
+#
+# Returns the value of every cell and the policy, the index in
+# grid.neighbours of the best move from every cell (-1 for the cells
+# where the game is over).
+def valueIteration(grid, losses, golds):
+    outcomes = transitions(grid)
+    terminal = numpy.zeros(grid.size, dtype=bool)
+    rewards = numpy.zeros(grid.size)
+    for cell in losses:
+        terminal[cell] = True
+        rewards[cell] = config.lossReward
+    for cell in golds:
+        terminal[cell] = True
+        rewards[cell] = config.goldReward
+
+    values = rewards.copy()
+    discount = config.discount
+    while True:
+        expected = numpy.empty((len(outcomes), grid.size))
+        for move, results in enumerate(outcomes):
+            expected[move] = sum(probability * values[cells] for probability, cells in results)
+        updated = numpy.where(terminal, rewards, config.moveReward + discount * expected.max(axis=0))
+        change = numpy.abs(updated - values).max()
+        values = updated
+        if change < config.valueTolerance:
+            break
+
+    policy = expected.argmax(axis=0).astype(numpy.int8)
+    policy[terminal] = -1
+    return values, policy
+
+# The last layout a policy was worked out for, and that policy. Only
+# one is kept: once a piece of gold has been looted the layout before
+# it never comes back, and when the Wumpus move there is a new layout
+# nearly every step, so older policies would only pile up (a byte a
+# cell each, which on a big grid adds up over a game).
+policyCache = None
+
+# The policy for grid with the given losses and golds (sets of cells).
+def getPolicy(grid, losses, golds):
+    global policyCache
+    key = (grid.width, grid.height, frozenset(losses), frozenset(golds))
+    if policyCache is None or policyCache[0] != key:
+        policyCache = (key, valueIteration(grid, losses, golds)[1])
+    return policyCache[1]
+
+# The path that policy takes from start if every move goes where it is
+# meant to, as a list of directions. It stops when it reaches a cell
+# where the game is over, or one it has already been through.
+def policyPath(grid, policy, start):
+    path = []
+    seen = {start}
+    cell = start
+    while policy[cell] >= 0:
+        direction, table = grid.neighbours[policy[cell]]
+        cell = table[cell]
+        if cell < 0 or cell in seen:
+            break
+        path.append(direction)
+        seen.add(cell)
+    return path
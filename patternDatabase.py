@@ -0,0 +1,195 @@
+# patternDatabase.py
+#
+# Pattern database heuristics for the joint puzzle search in
+# puzzleSolver.py.
+#
+# A pattern database is a table of exact costs for part of the
+# problem, worked out once, so that the heuristic during the search is
+# just a lookup. We keep:
+#
+# - for each goal cell, the exact number of moves from every cell of
+#   the grid to it (found with breadth first search back from the
+#   goal);
+# - when there are two or three Wumpus and the grid is small enough,
+#   a pairwise table giving, for every pair of cells, the cost of
+#   getting two Wumpus from those cells onto the first two Wumpus goal
+#   cells, whichever Wumpus ends up on which.
+#
+# The tables are arrays of integers, are built once for each grid and
+# goal, and are saved to config.patternDatabaseDirectory so that later
+# runs can just load them. Only the integers are saved, one table after
+# another, so loading a file never runs anything from it. The file
+# name says what the file holds, including the version of the format
+# and config.pairwiseTableLimit, so a file from a different setup is
+# never picked up, and a file is only used if it is exactly as long as
+# the tables it should hold. Files are written under another name and
+# then renamed, so a run (or another process in a batch) never reads
+# one that is half written.
+#
+# Written by: Max Butler
+
+import os
+import tempfile
+from array import array
+import config
+import distanceField
+import matching
+
+# The version of the format the tables are saved in. Change it when
+# what is saved changes.
+formatVersion = 2
+
+# The goal cells that have a distance table, in the order the tables
+# are kept, and whether there is a pairwise table after them.
+def layout(grid, goalCells):
+    cells = list(dict.fromkeys(goalCells))
+    usesPairs = 2 <= len(goalCells) - 1 <= 3 and grid.size * grid.size <= config.pairwiseTableLimit
+    return cells, usesPairs
+
+class PatternDatabase():
+
+    # goalCells is [Link, Wumpus1, ...] in the goal state, with the
+    # Wumpus sorted. tables are the tables that were saved by an
+    # earlier run, in the order of self.tables, or None to build them.
+    def __init__(self, grid, goalCells, tables=None):
+        self.size = grid.size
+        self.goalLink = goalCells[0]
+        self.goalWumpus = goalCells[1:]
+
+        cells, usesPairs = layout(grid, goalCells)
+        if tables is None:
+            tables = [distanceField.distanceTable(grid, cell) for cell in cells]
+            if usesPairs:
+                tables.append(pairTable(tables[cells.index(self.goalWumpus[0])], tables[cells.index(self.goalWumpus[1])]))
+        self.tables = tables
+
+        self.distances = dict(zip(cells, tables))
+        self.pairs = tables[len(cells)] if usesPairs else None
+
+    # The heuristic for a packed state of a JointSpace: Link's exact
+    # distance to its goal plus the exact cost of the cheapest way of
+    # getting the Wumpus onto their goal cells. Moves are independent
+    # in the puzzle, so this is exact, and it never overestimates.
+    def heuristic(self):
+        size = self.size
+        linkDistance = self.distances[self.goalLink]
+        wumpusDistances = [self.distances[cell] for cell in self.goalWumpus]
+        pairs = self.pairs
+        numberOfWumpus = len(self.goalWumpus)
+
+        if pairs is not None and numberOfWumpus == 2:
+            def heuristic(state):
+                state, link = divmod(state, size)
+                second, first = divmod(state, size)
+                return linkDistance[link] + pairs[first * size + second]
+
+        elif pairs is not None and numberOfWumpus == 3:
+            third = wumpusDistances[2]
+
+            def heuristic(state):
+                state, link = divmod(state, size)
+                state, a = divmod(state, size)
+                c, b = divmod(state, size)
+                # Try each Wumpus on the third goal cell, and the
+                # other two on the first two.
+                return linkDistance[link] + min(pairs[b * size + c] + third[a],
+                                                pairs[a * size + c] + third[b],
+                                                pairs[a * size + b] + third[c])
+
+        else:
+            def heuristic(state):
+                state, link = divmod(state, size)
+                costs = []
+                for i in range(numberOfWumpus):
+                    state, cell = divmod(state, size)
+                    costs.append([distances[cell] for distances in wumpusDistances])
+                return linkDistance[link] + matching.matchingCost(costs)
+
+        return heuristic
+
+# For every pair of cells (a, b), the cost of moving one Wumpus from a
+# and one from b onto the two goals whose distance tables are given,
+# whichever goes where. Entry a * size + b.
+def pairTable(first, second):
+    size = len(first)
+    pairs = array('i', [0]) * (size * size)
+    for a in range(size):
+        firstA = first[a]
+        secondA = second[a]
+        row = a * size
+        for b in range(size):
+            pairs[row + b] = min(firstA + second[b], secondA + first[b])
+    return pairs
+
+# Databases that have already been built or loaded in this run.
+databaseCache = {}
+
+# Where the databases are saved. A relative
+# config.patternDatabaseDirectory is taken from the directory this file
+# is in, rather than from wherever the program was started.
+def databaseDirectory():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), config.patternDatabaseDirectory)
+
+def databaseFileName(grid, goalCells):
+    name = f"pdb_v{formatVersion}_{grid.width}x{grid.height}_limit{config.pairwiseTableLimit}_" + "_".join(str(cell) for cell in goalCells) + ".bin"
+    return os.path.join(databaseDirectory(), name)
+
+# The tables saved in fileName for goalCells on grid, or None if there
+# is no such file or it isn't what it should be.
+def loadTables(grid, goalCells, fileName):
+    cells, usesPairs = layout(grid, goalCells)
+    lengths = [grid.size] * len(cells) + ([grid.size * grid.size] if usesPairs else [])
+    try:
+        if os.path.getsize(fileName) != sum(lengths) * array('i').itemsize:
+            print("Ignoring pattern database of the wrong size", fileName)
+            return None
+        tables = []
+        with open(fileName, "rb") as f:
+            for length in lengths:
+                table = array('i')
+                table.fromfile(f, length)
+                tables.append(table)
+        return tables
+    except (OSError, EOFError):
+        print("Could not load pattern database", fileName)
+        return None
+
+# Save tables to fileName, writing them to a temporary file first and
+# renaming it, which replaces any file already there in one go.
+def saveTables(tables, fileName):
+    try:
+        os.makedirs(os.path.dirname(fileName), exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=os.path.dirname(fileName), suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as f:
+                for table in tables:
+                    table.tofile(f)
+            os.replace(temporary, fileName)
+        except OSError:
+            os.remove(temporary)
+            raise
+    except OSError:
+        print("Could not save pattern database", fileName)
+
+# The pattern database for getting to goalCells on grid. It comes from
+# memory if we have already used it, from disk if an earlier run saved
+# it, and otherwise it is built and saved.
+def getPatternDatabase(grid, goalCells):
+    goalCells = [goalCells[0]] + sorted(goalCells[1:])
+    key = (grid.width, grid.height, tuple(goalCells))
+    if key in databaseCache:
+        return databaseCache[key]
+
+    fileName = databaseFileName(grid, goalCells)
+    tables = None
+    if os.path.exists(fileName):
+        tables = loadTables(grid, goalCells, fileName)
+
+    if tables is None:
+        database = PatternDatabase(grid, goalCells)
+        saveTables(database.tables, fileName)
+    else:
+        database = PatternDatabase(grid, goalCells, tables)
+
+    databaseCache[key] = database
+    return database
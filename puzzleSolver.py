@@ -0,0 +1,238 @@
+# puzzleSolver.py
+#
+# Planning for the puzzle as a whole, rather than for Link and each
+# Wumpus on their own.
+#
+# A state of the puzzle is the cell (see grid.py) of Link and of each
+# of the Wumpus. These are packed into a single integer, treating the
+# cells as the digits of a number in base n, where n is the number of
+# cells in the grid:
+#
+#   state = link + wumpus1 * n + wumpus2 * n^2 + ...
+#
+# so a state can be hashed and compared as cheaply as any other
+# integer.
+#
+# The Wumpus are interchangeable: the puzzle is solved when there is
+# a Wumpus on each of the goal cells, whichever Wumpus that is (see
+# utils.sameWumpus()). So the Wumpus cells are kept sorted inside a
+# state. This makes every state that differs only in which Wumpus is
+# where the same state, and a search over k Wumpus sees each
+# arrangement once rather than k! times.
+#
+# Written by: Max Butler
+
+import config
+import search
+import matching
+import patternDatabase
+
+class JointSpace():
+
+    def __init__(self, grid, numberOfAgents):
+        self.grid = grid
+        self.numberOfAgents = numberOfAgents
+        self.powers = [grid.size ** i for i in range(numberOfAgents)]
+
+    # Pack a list of cells, [Link, Wumpus1, Wumpus2, ...], into a
+    # state, and unpack it again. The Wumpus come back sorted by
+    # cell, whatever order they went in.
+    def pack(self, cells):
+        state = 0
+        for cell, power in zip([cells[0]] + sorted(cells[1:]), self.powers):
+            state += cell * power
+        return state
+
+    def unpack(self, state):
+        cells = []
+        for i in range(self.numberOfAgents):
+            state, cell = divmod(state, self.grid.size)
+            cells.append(cell)
+        return cells
+
+    # Every agent can move in any direction that keeps it on the grid.
+    # As in PuzzleWorld.takeStep(), agents are allowed to share a cell.
+    #
+    # Actions are (slot, direction) pairs. Slot 0 is Link, and slot i
+    # is the i-th Wumpus in cell order, which is not necessarily
+    # Wumpus i (see toMoves()).
+    def successors(self, state):
+        neighbours = self.grid.neighbours
+        cells = self.unpack(state)
+        link = cells[0]
+        children = []
+
+        for direction, table in neighbours:
+            child = table[link]
+            if child >= 0:
+                children.append(((0, direction), state + child - link))
+
+        for slot in range(1, self.numberOfAgents):
+            cell = cells[slot]
+            # Two Wumpus in the same cell have the same moves
+            if slot > 1 and cells[slot - 1] == cell:
+                continue
+            for direction, table in neighbours:
+                child = table[cell]
+                if child >= 0:
+                    moved = cells[:]
+                    moved[slot] = child
+                    children.append(((slot, direction), self.pack(moved)))
+        return children
+
+    # Turn a list of (slot, direction) actions from the start state
+    # into moves in the format that PuzzleWorld.takeStep() expects,
+    # working out which Wumpus is in each slot as the moves are made.
+    def toMoves(self, startCells, actions):
+        tables = dict(self.grid.neighbours)
+        cells = startCells[:]
+        moves = []
+        for slot, direction in actions:
+            if slot == 0:
+                agent = 0
+            else:
+                agent = sorted(range(1, self.numberOfAgents), key=cells.__getitem__)[slot - 1]
+            cells[agent] = tables[direction][cells[agent]]
+            move = [0] * self.numberOfAgents
+            move[agent] = direction
+            moves.append(move)
+        return moves
+
+    # Turn a list of states, each one move from the last, into moves
+    # in the format that PuzzleWorld.takeStep() expects. The moves are
+    # worked out by seeing which cell changed between one state and
+    # the next.
+    def movesBetween(self, startCells, states):
+        cells = startCells[:]
+        moves = []
+        for before, after in zip(states, states[1:]):
+            old = self.unpack(before)
+            new = self.unpack(after)
+            if old[0] != new[0]:
+                source, target = old[0], new[0]
+                agent = 0
+            else:
+                # One Wumpus cell is in old and not new, and one the
+                # other way round.
+                remaining = new[1:]
+                for cell in old[1:]:
+                    if cell in remaining:
+                        remaining.remove(cell)
+                    else:
+                        source = cell
+                target = remaining[0]
+                agent = cells.index(source, 1)
+            for direction, table in self.grid.neighbours:
+                if table[source] == target:
+                    break
+            cells[agent] = target
+            move = [0] * self.numberOfAgents
+            move[agent] = direction
+            moves.append(move)
+        return moves
+
+# The cells of Link and the Wumpus in world, in [Link, Wumpus1, ...]
+# order.
+def agentCells(world, grid):
+    return [grid.toCell(world.lLoc)] + [grid.toCell(loc) for loc in world.wLoc]
+
+# Plan for all the agents in world together, to get them to the
+# positions they have in goal. algorithm is one of the searches in
+# search.py, and the informed searches use the pattern database
+# heuristic (see patternDatabase.py). Returns a plan in the format of PuzzleWorld.plan, or []
+# if there is no plan.
+def jointSearch(world, goal, algorithm=search.aStarSearch):
+    grid = world.grid()
+    space = JointSpace(grid, len(world.wLoc) + 1)
+    startCells = agentCells(world, grid)
+    start = space.pack(startCells)
+    goalCells = agentCells(goal, grid)
+    goalState = space.pack(goalCells)
+
+    args = ()
+    if algorithm in search.informedSearches:
+        args = (patternDatabase.getPatternDatabase(grid, goalCells).heuristic(),)
+    actions = algorithm(start, lambda state: state == goalState, space.successors, *args)
+
+    if actions is None:
+        print("Failed to find a plan")
+        return []
+    return space.toMoves(startCells, actions)
+
+# Plan for all the agents in world together with breadth first search
+# from both the start and goal at once. Every move in the puzzle can be
+# undone by moving the same agent back, so the successors of a state
+# are also the states that lead to it.
+def bidirectionalJointSearch(world, goal):
+    grid = world.grid()
+    space = JointSpace(grid, len(world.wLoc) + 1)
+    startCells = agentCells(world, grid)
+    states = search.bidirectionalSearch(space.pack(startCells), space.pack(agentCells(goal, grid)), space.successors)
+
+    if states is None:
+        print("Failed to find a plan")
+        return []
+    return space.movesBetween(startCells, states)
+
+# Plan for all the agents in world together with IDA*, using the
+# pattern database heuristic and a transposition table whose size and
+# replacement scheme come from config.py. Memory stays bounded however
+# many Wumpus there are, and the plan is still optimal.
+def idaStarJointSearch(world, goal):
+    grid = world.grid()
+    space = JointSpace(grid, len(world.wLoc) + 1)
+    startCells = agentCells(world, grid)
+    goalCells = agentCells(goal, grid)
+    goalState = space.pack(goalCells)
+    heuristic = patternDatabase.getPatternDatabase(grid, goalCells).heuristic()
+    table = search.makeTranspositionTable(config.transpositionTableSize, config.transpositionReplacement)
+
+    actions = search.idaStarSearch(space.pack(startCells), lambda state: state == goalState, space.successors, heuristic, table)
+
+    if actions is None:
+        print("Failed to find a plan")
+        return []
+    return space.toMoves(startCells, actions)
+
+# Plan for the puzzle when each agent can be planned for on its own.
+#
+# When moves are independent (see PuzzleWorld.movesAreIndependent),
+# the cheapest plan costs Link's distance to its goal cell plus the
+# cost of the cheapest matching of Wumpus to the Wumpus goal cells, and
+# it can be made by moving each agent straight to its cell in turn.
+# So all this needs is the Hungarian algorithm over the Manhattan
+# distances, with no search at all.
+def separableSearch(world, goal):
+    grid = world.grid()
+    numberOfAgents = len(world.wLoc) + 1
+    starts = agentCells(world, grid)
+    targets = agentCells(goal, grid)
+    xOf = grid.xOf
+    yOf = grid.yOf
+
+    costs = [[abs(xOf[cell] - xOf[target]) + abs(yOf[cell] - yOf[target]) for target in targets[1:]] for cell in starts[1:]]
+    assignment = [0] + [column + 1 for column in matching.hungarian(costs)]
+
+    # Which way to move to change x or y by one
+    directionOf = {delta: direction for direction, delta in world.moveDeltas.items()}
+
+    plan = []
+    for agent in range(numberOfAgents):
+        cell = starts[agent]
+        target = targets[assignment[agent]]
+        for delta, steps in (((1, 0), xOf[target] - xOf[cell]), ((0, 1), yOf[target] - yOf[cell])):
+            if steps < 0:
+                delta = (-delta[0], -delta[1])
+            # takeStep() never changes a move, so every step in the
+            # same direction can share one list.
+            move = [0] * numberOfAgents
+            move[agent] = directionOf[delta]
+            plan.extend([move] * abs(steps))
+    return plan
+
+# Pick the quickest planner that gives an optimal plan for the puzzle
+# in world.
+def findPlan(world, goal):
+    if world.movesAreIndependent:
+        return separableSearch(world, goal)
+    return jointSearch(world, goal)
@@ -10,15 +10,28 @@ import random
 import config
 import utils
 import copy
-import heapq
+import search
+import puzzleSolver
 from world import World
 from utils import Pose
 from utils import Directions
 from utils import State
-from node import Node
 
 class PuzzleWorld(World):
 
+    # In the puzzle NORTH is the direction of decreasing y (see
+    # takeStep()).
+    moveDeltas = {Directions.NORTH: (0, -1),
+                  Directions.SOUTH: (0, 1),
+                  Directions.EAST:  (1, 0),
+                  Directions.WEST:  (-1, 0)}
+
+    # takeStep() only stops a move at the edge of the grid: agents can
+    # share cells and nothing else gets in the way. The planners in
+    # puzzleSolver.py use this to split the puzzle into one problem
+    # per agent.
+    movesAreIndependent = True
+
     def __init__(self):
 
         # Import boundaries of the world. because we index from 0,
@@ -26,20 +39,25 @@ class PuzzleWorld(World):
         self.maxX = config.worldLength - 1
         self.maxY = config.worldBreadth - 1
 
-        # Keep a list of locations that have been used.
+        # Keep a list of locations that have been used, and a set of
+        # them so that picking a new one doesn't have to go through the
+        # list.
         self.locationList = []
+        self.takenCells = set()
 
         # Wumpus
         self.wLoc = []
         for i in range(config.numberOfWumpus):
-            newLoc = utils.pickUniquePose(self.maxX, self.maxY, self.locationList)
+            newLoc = utils.pickUniquePose(self.maxX, self.maxY, self.takenCells)
             self.wLoc.append(newLoc)
             self.locationList.append(newLoc)
+            self.takenCells.add((newLoc.x, newLoc.y))
 
         # Link
-        newLoc = utils.pickUniquePose(self.maxX, self.maxY, self.locationList)
+        newLoc = utils.pickUniquePose(self.maxX, self.maxY, self.takenCells)
         self.lLoc = newLoc
         self.locationList.append(newLoc)
+        self.takenCells.add((newLoc.x, newLoc.y))
         
         # Other elements that we don't use
         self.pLoc = []
@@ -54,13 +72,27 @@ class PuzzleWorld(World):
         # A plan
         self.plan = [[Directions.NORTH, 0, 0], [0, Directions.NORTH, 0], [0, 0, Directions.NORTH]]
 
+        # The goal the plan was made for, the next move of the plan to
+        # make, and where the agents should be if nobody else has moved
+        # them since the last move.
+        self.planGoal = None
+        self.nextStep = 0
+        self.expectedKey = None
+
+        # Indexes of where everything is (see World)
+        self.updateOccupancy()
+
+        # The canonical key of this state, worked out when it is first
+        # needed (see canonicalKey())
+        self.canonical = None
+
     #
     # Methods
     #
     # These are the functions that are used to update and report on
     # puzzle information.
     def isSolved(self, goal):
-        if utils.sameAs(self, goal):
+        if self.canonicalKey() == goal.canonicalKey():
             self.status = utils.State.WON 
             print("Puzzle Over!")
             return True
@@ -69,91 +101,110 @@ class PuzzleWorld(World):
 
     # A single move is to shift Link or one Wumpus in one direction.
     #
-    # This relies on having something in self.plan. Once this has been
-    # reduced to [], this code will just print a message each step.
+    # The puzzle only changes when we move something, so a plan is
+    # made once and then followed one move per call. We only plan
+    # again if we are given a different goal, if the puzzle is no
+    # longer where the plan expects it to be (because something other
+    # than makeAMove() has moved an agent), or if the plan has run out
+    # before the puzzle is solved.
     #
     # This is where you should start writing your solution to the
     # puzle problem.
     def makeAMove(self, goal):
-        
-        ### Link's movement logic ###
-        # goal is a pose object that represents the stationary Link's position
-        lGoalLocation = goal.lLoc
 
-        # CHOOSE 1 FROM THE FOLLOWING ALGORITHMS (do the same for Wumpus):
-        #self.plan = self.greedySearch(self.lLoc, lGoalLocation)
-        self.plan = self.aStarSearch(self.lLoc, lGoalLocation)
-        
-        #self.plan = self.breadthFirstSearch(self.lLoc, lGoalLocation)
-        #self.plan = self.depthFirstSearch(self.lLoc, lGoalLocation)
-        #self.plan = self.uniformCostSearch(self.lLoc, lGoalLocation)
-        
-        # validate the generated plan
-        print(f"Link plan generated: {self.plan}")
-        
-        # if there are moves in the plan, execute them
-        if self.plan:
-            
-            # get the first move from the plan
-            lNextMove = self.plan.pop(0)
-            
-            # calls the takeStep method to move Link
-            self.takeStep(lNextMove)
-                
-        else:
-            print("No Link plan available or Link already at the goal!")
+        planUsedUp = self.nextStep >= len(self.plan) and self.canonicalKey() != goal.canonicalKey()
+        if goal is not self.planGoal or self.stateKey() != self.expectedKey or planUsedUp:
 
-        # check if the puzzle is solved after making the move
-        if utils.sameLink(self, goal):
-            self.status = utils.State.WON
-        
-        
-        ### Wumpus movement logic ###
-        # goal is a pose object that represents the stationary Wumpus' positions
-        wGoalLocation = goal.wLoc
-
-        # iterate through each Wumpus and calculate its move
-        for wumpusIndex in range(len(self.wLoc)):
-            
-            # current wumpus is based off where in the index we are
-            currentWumpus = self.wLoc[wumpusIndex]
-            
-            # corresponding target position
-            wTargetPosition = wGoalLocation[wumpusIndex]
-
-            # CHOOSE 1 FROM THE FOLLOWING ALGORITHMS (do the same for Link):
-            #wumpusPlan = self.greedySearch(currentWumpus, wTargetPosition)
-            wumpusPlan = self.aStarSearch(currentWumpus, wTargetPosition)
-            
-            #wumpusPlan = self.breadthFirstSearch(currentWumpus, wTargetPosition)
-            #wumpusPlan = self.depthFirstSearch(currentWumpus, wTargetPosition)
-            #wumpusPlan = self.uniformCostSearch(currentWumpus, wTargetPosition)
-            
-            # validate the generated plan
-            print(f"Wumpus {wumpusIndex} plan generated: {wumpusPlan}")
+            # CHOOSE 1 FROM THE FOLLOWING PLANNERS:
+            # the quickest planner that gives an optimal plan (see puzzleSolver.py)
+            self.plan = self.findPlan(goal)
 
-            if wumpusPlan:
-                
-                # unwrap direction from the plan
-                wNextMove = wumpusPlan.pop(0)[0]
+            # plan for Link and all the Wumpus together
+            #self.plan = self.jointAStarSearch(goal)
+            #self.plan = self.bidirectionalSearch(goal)
+            #self.plan = self.idaStarSearch(goal)
 
-                # Initialize move list with zeros
-                wumpus_moves = [0] * len(self.wLoc)
-                
-                # assign a move for this Wumpus
-                wumpus_moves[wumpusIndex] = wNextMove
+            # plan for Link and then each Wumpus on their own
+            #self.plan = self.separatePlans(goal)
 
-                # validates whether the wumpus has made a move
-                print(f"Before step for Wumpus {wumpusIndex}: {currentWumpus}")
-                
-                # calls the takeStep method to move the Wumpus
-                self.takeStep([0] + wumpus_moves)
-                print(f"After step for Wumpus {wumpusIndex}: {self.wLoc[wumpusIndex]}")
-                
-            else:
-                print(f"No plan for Wumpus {wumpusIndex} or Wumpus already at the goal.")
+            self.planGoal = goal
+            self.nextStep = 0
 
+            # validate the generated plan
+            print(f"Plan generated with {len(self.plan)} moves")
 
+        # if there are moves left in the plan, execute the next one
+        if self.nextStep < len(self.plan):
+            self.takeStep(self.plan[self.nextStep])
+            self.nextStep += 1
+            self.expectedKey = self.stateKey()
+        else:
+            print("No plan available or the puzzle is already solved!")
+
+    # Agents can share cells (see movesAreIndependent) and the puzzle
+    # has no pits, so a search for a single agent has nothing to go
+    # round.
+    def blockedCells(self):
+        return frozenset()
+
+    # Where Link and each of the Wumpus are, in order.
+    def stateKey(self):
+        return ((self.lLoc.x, self.lLoc.y),) + tuple((loc.x, loc.y) for loc in self.wLoc)
+
+    # Link's cell followed by the Wumpus cells in sorted order, so that
+    # two states with the Wumpus in the same places have the same key
+    # whichever Wumpus is where (as utils.sameAs() does). It is kept
+    # until takeStep() changes the state, so checking against the goal,
+    # which never moves, is just comparing two tuples.
+    def canonicalKey(self):
+        if self.canonical is None:
+            self.canonical = (self.cellOf(self.lLoc),) + tuple(sorted(self.cellOf(loc) for loc in self.wLoc))
+        return self.canonical
+
+    # Plan for all of the agents, splitting the puzzle into one
+    # problem per agent when the agents can't get in each other's way.
+    def findPlan(self, goal):
+        return puzzleSolver.findPlan(self, goal)
+
+    # Plan for all of the agents at once, searching over the joint
+    # state of Link and the Wumpus.
+    def jointAStarSearch(self, goal):
+        return puzzleSolver.jointSearch(self, goal, search.aStarSearch)
+
+    # Plan for all of the agents at once, with breadth first search from
+    # both this state and the goal.
+    def bidirectionalSearch(self, goal):
+        return puzzleSolver.bidirectionalJointSearch(self, goal)
+
+    # Plan for all of the agents at once with IDA*, in bounded memory.
+    def idaStarSearch(self, goal):
+        return puzzleSolver.idaStarJointSearch(self, goal)
+
+    # Plan for Link and then each Wumpus in turn with one of the single
+    # agent searches, pairing self.wLoc[i] with goal.wLoc[i], and put
+    # the plans one after the other.
+    def separatePlans(self, goal):
+        numberOfAgents = len(self.wLoc) + 1
+        starts = [self.lLoc] + self.wLoc
+        targets = [goal.lLoc] + goal.wLoc
+        plan = []
+
+        for agent in range(numberOfAgents):
+
+            # CHOOSE 1 FROM THE FOLLOWING ALGORITHMS:
+            #agentPlan = self.greedySearch(starts[agent], targets[agent])
+            agentPlan = self.aStarSearch(starts[agent], targets[agent])
+
+            #agentPlan = self.breadthFirstSearch(starts[agent], targets[agent])
+            #agentPlan = self.depthFirstSearch(starts[agent], targets[agent])
+            #agentPlan = self.uniformCostSearch(starts[agent], targets[agent])
+
+            for direction in agentPlan:
+                move = [0] * numberOfAgents
+                move[agent] = direction
+                plan.append(move)
+
+        return plan
 
     # A move is a list of the directions that [Link, Wumpus1, Wumpus2,
     # ...] move in.  takeStep decodes these and makes the relevant
@@ -162,7 +213,10 @@ class PuzzleWorld(World):
     # direction. Movements that exceed the limits of the world have no
     # effect.
     def takeStep(self, move):
-        
+
+        # Something is going to move, so the key is out of date
+        self.canonical = None
+
         # Debug the input move
         print(f"takeStep received move: {move}")
         print(f"Move type: {type(move)}, Direction type: {type(move[0])}")
@@ -218,232 +272,27 @@ class PuzzleWorld(World):
                         # move West
                         self.wLoc[j].x -= 1
                     print(f"Wumpus {i-1}'s position after move: {self.wLoc[j]}")
+                    self.updateWumpusOccupancy()
                             
                             
-    ### search algorithms and their required methods ###
+    ### search algorithms ###
+    # All of these hand over to the shared engine in search.py, just
+    # as Link's do. Each returns a list of directions for a single
+    # agent.
     def greedySearch(self, start, goal):
-        
         print(f"Starting Greedy Search from {start} to {goal}")
-        node = Node(start, None, None, 0)
-        
-        # Goal test:
-        if node.isGoal(goal):
-            print("Start and end locations are the same")
-            return []
-        
-        frontiers = []
-        heapq.heappush(frontiers, (utils.separation(start, goal), node))  # use heapq for priority queue
-        explored = set()
-        
-        while frontiers:
-            _, node = heapq.heappop(frontiers)  # get the node with the lowest heuristic value
-            
-            nodeLocation = (node.location.x, node.location.y)
-            print(f"Exploring node at {nodeLocation}")
-            
-            # check if the moving one matches the stationary one (goal state)
-            if node.location == goal:  # compare the current state with the goal state
-                return self.recoverPlan(node)
-            
-            # check for goal
-            if node.isGoal(goal):
-                print("Found goal")
-                return self.recoverPlan(node)
-            
-            # mark the node as explored after popping it from the frontier
-            explored.add(nodeLocation)
-            
-            # for each action the agent can take
-            for action in self.getActions(node.location):
-                child = self.createChildNode(node, action)
-                child_location = (child.location.x, child.location.y)
-
-                # if the child hasn't been explored and isn't already in the frontier
-                if child_location not in explored:
-                    heuristic_value = utils.separation(child.location, goal)  # calculate the Euclidean distance
-                    heapq.heappush(frontiers, (heuristic_value, child))
-                    print(f"Adding child node at {child_location} with heuristic {heuristic_value}")
-        
-        print("Failed to find a path")
-        return []
-    
+        return search.findPath(self, search.greedySearch, start, goal)
+
     def aStarSearch(self, start, goal):
-        node = Node(start, None, None, 0)
-        
-        # goal test:
-        if node.isGoal(goal):
-            print("Start and end locations are the same")
-            return []
-        
-        frontiers = []
-        heapq.heappush(frontiers, (utils.separation(start, goal) + node.pathCost, node)) # uses heapq to create a heap queue - picks node with LOWEST heuristic value (this value is the closes path to the goal)
-        explored = set()
-        
-        while frontiers:
-            _, node = heapq.heappop(frontiers) # get the FIRST item
-            
-            nodeLocation = (node.location.x, node.location.y)
-            
-            # check for goal
-            if node.isGoal(goal):
-                print("Found goal")
-                return self.recoverPlan(node)
-            
-            explored.add(nodeLocation)  # mark as visited
-            
-            # for each action the vacuum can take
-            for action in self.getActions(node.location):
-                child = self.createChildNode(node, action)
-                child_location = (child.location.x, child.location.y)
-
-                # if the child hasn't been explored, add it based on heuristic
-                if child_location not in explored:
-                    heuristic_value = utils.separation(child.location, goal)  # calculate the Euclidean distance
-                    heapq.heappush(frontiers, (heuristic_value, child))
-                    explored.add(child_location)  # add to explored                    
-        
-        print("Failed to find a path")
-        return []
-    
+        return search.findPath(self, search.aStarSearch, start, goal)
+
     def depthFirstSearch(self, start, goal):
         print("DFS started!")
+        return search.findPath(self, search.depthFirstSearch, start, goal)
 
-        node = Node(start, None, None)
-        
-        # goal test:
-        if node.isGoal(goal):
-            return []
-        
-        frontiers = [node] 
-        explored = []        
-        
-        while frontiers:
-            node = frontiers[-1] # get the last item
-            frontiers = frontiers[:-1] # remove the last item
-            
-            # for each action Link can take
-            for action in self.getActions(node.location):
-                child = self.createChildNode(node, action)
-                
-                # note, in the Node class we override the equals operator --- two nodes are equal if the location is the same (which means we can use "not in" here). 
-                if child not in explored and child not in frontiers:
-
-                    # check for goal
-                    if child.isGoal(goal):
-                        print("Found goal")
-                        #path = self.recoverPlan(child)
-                        #print("Recovered path:", path)  # Add this line to check the recovered path
-                    frontiers.append(child)
-            
-            explored.append(node)                        
-        
-        print("Failed to find a path")
-        return []
-    
     def breadthFirstSearch(self, start, goal):
         print("BFS started!")
+        return search.findPath(self, search.breadthFirstSearch, start, goal)
 
-        node = Node(start, None, None)
-        print("Node created!")
-
-        # Goal test:
-        if node.isGoal(goal):
-            print("Start and end locations are the same")
-            return []
-
-        frontiers = [node]  # BFS uses a queue (FIFO)
-        explored = []    
-
-        while frontiers:
-            node = frontiers[0]  # Get the FIRST item (FIFO)
-            node = frontiers.pop(0)  # Remove from the front (FIFO)  # Remove the FIRST item
-
-            # For each action Link can take
-            for action in self.getActions(node.location):
-                child = self.createChildNode(node, action)
-
-                # Check if child is in explored or frontiers
-                if child not in explored and child not in frontiers:
-                    # Check for goal
-                    if child.isGoal(goal):
-                        print("Found goal")
-                    frontiers.append(child)  # BFS adds new nodes to the **end** (FIFO)
-            
-            explored.append(node)                        
-
-        print("Failed to find a path")
-        return []
-    
     def uniformCostSearch(self, start, goal):
-        node = Node(start, None, None, 0)
-        
-        # goal test:
-        if node.isGoal(goal):
-            print("Start and end locations are the same")
-            return []
-        
-        frontiers = []
-        heapq.heappush(frontiers, (0, node)) # uses heapq to create a heap queue
-        explored = {}
-        
-        while frontiers:
-            cost, node = heapq.heappop(frontiers) # get the FIRST item
-            
-            # check for goal
-            if node.isGoal(goal):
-                print("Found goal")
-                return self.recoverPlan(node)
-            
-            explored[node.location.x, node.location.y] = cost
-            
-            # for each action the vacuum can take
-            for action in self.getActions(node.location):
-                child = self.createChildNode(node, action)
-                child.pathCost = node.pathCost + 1
-                
-                # note, in the Node class we override the equals operator --- two nodes are equal if the location is the same (which means we can use "not in" here). 
-                if (child.location.x, child.location.y) not in explored or explored[(child.location.x, child.location.y)] > child.pathCost:
-                    heapq.heappush(frontiers, (child.pathCost, child))
-                    explored[(child.location.x, child.location.y)] = child.pathCost                        
-        
-        print("Failed to find a path")
-        return []
-
-    ### methods that help the algorithms run ###
-    # creates a child node of the parent for the given direction
-    def createChildNode(self, parent, action):
-        if action == Directions.EAST:
-            return Node( utils.Pose(parent.location.x + 1, parent.location.y), parent, action)
-        if action == Directions.WEST:
-            return Node( utils.Pose(parent.location.x - 1, parent.location.y), parent, action)
-        if action == Directions.SOUTH:
-            return Node( utils.Pose(parent.location.x, parent.location.y + 1), parent, action)
-        if action == Directions.NORTH:
-            return Node( utils.Pose(parent.location.x, parent.location.y - 1), parent, action)
-        
-            
-    # traces back from the goal node to the starting node - returns the path
-    def recoverPlan(self, node):
-        path = []
-    
-        while node.parent is not None:
-            path.append([node.action])  # Wrap node.action in a list
-            node = node.parent
-        
-        path.reverse()
-        
-        return path
-
-    # recursive version of recoverPlan() - calls itself recursivley to trace back from the goal node to the starting node
-    def recoverPlanRecursive(self, node, plan):
-        if node.parent:            
-            self.recoverPlanRecursive(node.parent, plan)
-            plan.append(node.action)
-
-    # defines how 2 nodes are compared for equality - useful for checking if a node has been visited or added to the frontiers
-    def __eq__(self, other):
-        return isinstance(other, Node) and self.location == other.location
-
-    # allows node objects to be used in the sets - hashes them based on their location
-    def __hash__(self):
-        return hash(self.location)
+        return search.findPath(self, search.uniformCostSearch, start, goal)
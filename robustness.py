@@ -0,0 +1,78 @@
+# robustness.py
+#
+# How likely a plan is to work when Link's moves can go astray.
+#
+# A plan from one of the searches is a list of directions that gets
+# Link to the gold if every move goes where it is meant to. With
+# config.nonDeterministic some of them won't: a move that slips leaves
+# Link where they are (see mdp.py), and the rest of the plan is then
+# carried on from there, one cell off from where it was meant to be.
+# Rather than playing whole games to find out how often that works, we
+# replay the plan many times at once: the positions of all the samples
+# are one NumPy array, and each move of the plan is a lookup in the
+# move tables for every sample together.
+#
+# A sample succeeds if it reaches a goal cell before it falls in a pit
+# or meets a Wumpus, and fails if it does either first or if the plan
+# runs out.
+#
+# Written by: Max Butler
+
+import random
+import config
+import mdp
+from utils import numpy
+
+# Replay plan from start (a cell of grid) config.robustnessSamples
+# times. losses and goals are sets of cells.
+#
+# Returns the chance of success and the expected number of moves it
+# takes when it does succeed (None if it never does).
+def evaluatePlan(grid, losses, goals, start, plan, samples=None):
+    if samples is None:
+        samples = config.robustnessSamples
+    if start in goals:
+        return 1.0, 0.0
+    # Seeded from random, so that runs seeded with random.seed() give
+    # the same answers each time
+    generator = numpy.random.default_rng(random.getrandbits(32))
+    tables = mdp.moveTables(grid)
+
+    isLoss = numpy.zeros(grid.size, dtype=bool)
+    isLoss[list(losses)] = True
+    isGoal = numpy.zeros(grid.size, dtype=bool)
+    isGoal[list(goals)] = True
+
+    positions = numpy.full(samples, start, dtype=numpy.intp)
+    # Samples that are still following the plan
+    going = numpy.ones(samples, dtype=bool)
+    succeeded = numpy.zeros(samples, dtype=bool)
+    steps = numpy.zeros(samples, dtype=numpy.intp)
+
+    intended = config.directionProbability
+    for step, direction in enumerate(plan):
+        moved = generator.random(samples) < intended
+        positions = numpy.where(going & moved, tables[direction][positions], positions)
+
+        arrived = going & isGoal[positions]
+        succeeded |= arrived
+        steps[arrived] = step + 1
+        going &= ~(arrived | isLoss[positions])
+        if not going.any():
+            break
+
+    successes = succeeded.sum()
+    if successes == 0:
+        return 0.0, None
+    return float(successes / samples), float(steps[succeeded].mean())
+
+# Evaluate each of plans, and return (chance of success, expected
+# moves, plan) for each, the most likely to succeed first and, between
+# those that are as likely, the quickest.
+def rankPlans(grid, losses, goals, start, plans, samples=None):
+    ranked = []
+    for plan in plans:
+        chance, moves = evaluatePlan(grid, losses, goals, start, plan, samples)
+        ranked.append((chance, moves, plan))
+    ranked.sort(key=lambda result: (-result[0], result[1] if result[1] is not None else float('inf')))
+    return ranked
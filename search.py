@@ -0,0 +1,399 @@
+# search.py
+#
+# The search engine shared by Link (link.py) and the puzzle
+# (puzzleWorld.py).
+#
+# There is one search loop, graphSearch(), and the behaviour of the
+# search comes from the frontier that is plugged into it:
+#
+# - FifoFrontier gives breadth first search
+# - LifoFrontier gives depth first search
+# - PriorityFrontier gives uniform cost, greedy and A* search,
+#   depending on what the evaluation function returns.
+#
+# States can be anything hashable (tuples, integers), and the closed
+# and open lists are both held in a single dictionary, so checking
+# whether a state has been seen is O(1) rather than a scan along a
+# list.
+#
+# Written by: Max Butler
+
+import heapq
+import itertools
+from collections import deque
+from collections import OrderedDict
+
+#
+# Frontiers
+#
+# Every frontier supports push(item, priority), pop() and len(). The
+# FIFO and LIFO frontiers ignore the priority.
+
+# First in, first out. A deque makes popping from the front O(1)
+# where list.pop(0) is O(n).
+class FifoFrontier():
+
+    def __init__(self):
+        self.queue = deque()
+
+    def push(self, item, priority=None):
+        self.queue.append(item)
+
+    def pop(self):
+        return self.queue.popleft()
+
+    def __len__(self):
+        return len(self.queue)
+
+# Last in, first out.
+class LifoFrontier():
+
+    def __init__(self):
+        self.stack = []
+
+    def push(self, item, priority=None):
+        self.stack.append(item)
+
+    def pop(self):
+        return self.stack.pop()
+
+    def __len__(self):
+        return len(self.stack)
+
+# Lowest priority first. The counter breaks ties between equal
+# priorities in insertion order, and means that heapq never has to
+# compare two items.
+class PriorityFrontier():
+
+    def __init__(self):
+        self.heap = []
+        self.counter = itertools.count()
+
+    def push(self, item, priority=0):
+        heapq.heappush(self.heap, (priority, next(self.counter), item))
+
+    def pop(self):
+        return heapq.heappop(self.heap)[2]
+
+    def __len__(self):
+        return len(self.heap)
+
+#
+# The search
+#
+
+# Search from start until isGoal() holds.
+#
+# successors(state) returns (action, nextState) pairs, and each action
+# costs 1, or stepCost(nextState) if that is given. evaluate(g, state) gives the priority a state is pushed
+# with, and is only needed for a PriorityFrontier. If reopen is True
+# then a state is pushed again when it is reached by a cheaper path,
+# which is what uniform cost search and A* need. States deeper than
+# depthLimit are not expanded.
+#
+# Returns the list of actions that leads from start to the goal ([] if
+# start is the goal), or None if there is no such list.
+def graphSearch(start, isGoal, successors, frontier, evaluate=None, reopen=False, depthLimit=None, stepCost=None):
+    # parents maps every state that has been reached to the state and
+    # action it was reached from, and costs to the cheapest known
+    # cost. Together they stand in for both the explored list and the
+    # membership test on the frontier.
+    parents = {start: None}
+    costs = {start: 0}
+    frontier.push((start, 0), evaluate(0, start) if evaluate else None)
+
+    while frontier:
+        state, g = frontier.pop()
+
+        # A cheaper copy of this state has been pushed since this one
+        if g > costs[state]:
+            continue
+
+        if isGoal(state):
+            return recoverPlan(parents, state)
+
+        if depthLimit is not None and g >= depthLimit:
+            continue
+
+        childCost = g + 1
+        for action, child in successors(state):
+            if stepCost is not None:
+                childCost = g + stepCost(child)
+            if child in costs:
+                if not reopen or childCost >= costs[child]:
+                    continue
+            costs[child] = childCost
+            parents[child] = (state, action)
+            frontier.push((child, childCost), evaluate(childCost, child) if evaluate else None)
+
+    return None
+
+# Trace back from state to the start, returning the actions in the
+# order they need to be taken.
+def recoverPlan(parents, state):
+    plan = []
+    step = parents[state]
+    while step is not None:
+        state, action = step
+        plan.append(action)
+        step = parents[state]
+    plan.reverse()
+    return plan
+
+#
+# The standard searches
+#
+# These just pick the frontier and evaluation function, so that Link
+# and the puzzle can choose between them without knowing about the
+# details above. heuristic(state) should estimate the number of
+# actions left to reach the goal.
+
+def breadthFirstSearch(start, isGoal, successors):
+    return graphSearch(start, isGoal, successors, FifoFrontier())
+
+def depthFirstSearch(start, isGoal, successors):
+    return graphSearch(start, isGoal, successors, LifoFrontier())
+
+def depthLimitedSearch(start, isGoal, successors, depthLimit):
+    return graphSearch(start, isGoal, successors, LifoFrontier(), reopen=True, depthLimit=depthLimit)
+
+def uniformCostSearch(start, isGoal, successors):
+    return graphSearch(start, isGoal, successors, PriorityFrontier(), lambda g, state: g, reopen=True)
+
+# Uniform cost search where entering a state costs stepCost(state),
+# which must be positive, rather than 1.
+def weightedSearch(start, isGoal, successors, stepCost):
+    return graphSearch(start, isGoal, successors, PriorityFrontier(), lambda g, state: g, reopen=True, stepCost=stepCost)
+
+def greedySearch(start, isGoal, successors, heuristic):
+    return graphSearch(start, isGoal, successors, PriorityFrontier(), lambda g, state: heuristic(state))
+
+# Ties on f are broken in favour of the state with the smaller
+# heuristic value, that is the one that is further along.
+def aStarSearch(start, isGoal, successors, heuristic):
+    def evaluate(g, state):
+        h = heuristic(state)
+        return (g + h, h)
+    return graphSearch(start, isGoal, successors, PriorityFrontier(), evaluate, reopen=True)
+
+# Breadth first search from both ends at once, for problems where
+# every action can be undone, so that successors() also gives the
+# states that lead to a state. Each side keeps its own hashed record of
+# the states it has reached, and the search stops when the two meet.
+# If the answer is d actions long, each side only has to search about
+# d/2 deep, so on the order of 2b^(d/2) states are reached rather than
+# b^d.
+#
+# The side with the smaller frontier is grown one whole layer at a
+# time. Every meeting point found during that layer is checked, and the
+# shortest route through any of them is kept, so the answer is as
+# short as the one breadth first search would find.
+#
+# Returns the list of states from start to goal (including both), or
+# None if the two can't be joined.
+def bidirectionalSearch(start, goal, successors):
+    if start == goal:
+        return [start]
+
+    forwardParents = {start: None}
+    backwardParents = {goal: None}
+    forwardDepth = {start: 0}
+    backwardDepth = {goal: 0}
+    forwardLayer = [start]
+    backwardLayer = [goal]
+
+    while forwardLayer and backwardLayer:
+        if len(forwardLayer) <= len(backwardLayer):
+            layer, parents, depth, otherDepth = forwardLayer, forwardParents, forwardDepth, backwardDepth
+        else:
+            layer, parents, depth, otherDepth = backwardLayer, backwardParents, backwardDepth, forwardDepth
+
+        nextLayer = []
+        best = None
+        bestLength = None
+        for state in layer:
+            childDepth = depth[state] + 1
+            for action, child in successors(state):
+                if child in depth:
+                    continue
+                parents[child] = state
+                depth[child] = childDepth
+                nextLayer.append(child)
+                if child in otherDepth:
+                    length = childDepth + otherDepth[child]
+                    if best is None or length < bestLength:
+                        best = child
+                        bestLength = length
+
+        if best is not None:
+            path = []
+            state = best
+            while state is not None:
+                path.append(state)
+                state = forwardParents[state]
+            path.reverse()
+            state = backwardParents[best]
+            while state is not None:
+                path.append(state)
+                state = backwardParents[state]
+            return path
+
+        if layer is forwardLayer:
+            forwardLayer = nextLayer
+        else:
+            backwardLayer = nextLayer
+
+    return None
+
+#
+# Iterative deepening A*
+#
+# IDA* only keeps the current path, so it runs in memory proportional
+# to the length of the plan rather than to the number of states seen.
+# The price is that it visits states more than once. A transposition
+# table of fixed size remembers the cheapest cost at which states have
+# been reached in the current iteration, so that most repeat visits
+# are cut off, without letting memory grow.
+#
+# Both tables support newIteration(), lookup(state) and store(state,
+# g). Forgetting an entry only means more work, never a worse plan.
+
+# Keeps the most recently used entries.
+class LruTable():
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+
+    def newIteration(self):
+        self.entries.clear()
+
+    def lookup(self, state):
+        g = self.entries.get(state)
+        if g is not None:
+            self.entries.move_to_end(state)
+        return g
+
+    def store(self, state, g):
+        self.entries[state] = g
+        self.entries.move_to_end(state)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+# A fixed number of slots, each state hashing to one of them. When two
+# states want the same slot, the one reached at lower cost, that is
+# the one nearer the start with more search below it, keeps it.
+class DepthPreferredTable():
+
+    def __init__(self, size):
+        self.size = size
+        self.slots = [None] * size
+        self.iteration = 0
+
+    def newIteration(self):
+        self.iteration += 1
+
+    def lookup(self, state):
+        entry = self.slots[hash(state) % self.size]
+        if entry is not None and entry[2] == self.iteration and entry[0] == state:
+            return entry[1]
+        return None
+
+    def store(self, state, g):
+        index = hash(state) % self.size
+        entry = self.slots[index]
+        if entry is None or entry[2] != self.iteration or entry[0] == state or g <= entry[1]:
+            self.slots[index] = (state, g, self.iteration)
+
+# Make one of the tables above. replacement is "lru" or "depth".
+def makeTranspositionTable(size, replacement):
+    if replacement == "lru":
+        return LruTable(size)
+    if replacement == "depth":
+        return DepthPreferredTable(size)
+    raise ValueError(f"Unknown transposition table replacement: {replacement}")
+
+# Returns the list of actions that leads from start to the goal, or
+# None if there is no such list. The plan is optimal as long as
+# heuristic never overestimates.
+def idaStarSearch(start, isGoal, successors, heuristic, table):
+    bound = heuristic(start)
+    while True:
+        table.newIteration()
+        plan, bound = boundedSearch(start, isGoal, successors, heuristic, table, bound)
+        if plan is not None:
+            return plan
+        if bound is None:
+            return None
+
+# One iteration of IDA*: depth first search that goes no further than
+# states whose f = g + h is more than bound. Returns the plan if one is
+# found, and otherwise the smallest f that went over bound, which is
+# the bound for the next iteration (None if nothing went over).
+#
+# The search uses its own stack rather than recursion, since plans can
+# be longer than Python's recursion limit.
+def boundedSearch(start, isGoal, successors, heuristic, table, bound):
+    if isGoal(start):
+        return [], bound
+
+    nextBound = None
+    plan = []
+    table.store(start, 0)
+    stack = [(0, iter(successors(start)))]
+
+    while stack:
+        g, children = stack[-1]
+        childCost = g + 1
+        for action, child in children:
+            f = childCost + heuristic(child)
+            if f > bound:
+                if nextBound is None or f < nextBound:
+                    nextBound = f
+                continue
+            seen = table.lookup(child)
+            if seen is not None and seen <= childCost:
+                continue
+            table.store(child, childCost)
+            plan.append(action)
+            if isGoal(child):
+                return plan, bound
+            stack.append((childCost, iter(successors(child))))
+            break
+        else:
+            stack.pop()
+            if plan:
+                plan.pop()
+
+    return None, nextBound
+
+#
+# Searching the grid
+#
+
+# The searches that take a heuristic
+informedSearches = (greedySearch, aStarSearch)
+
+# Run one of the searches above over the grid of world, from start to
+# goal (both poses), and return the list of directions it found.
+#
+# The search itself runs over integer cells (see grid.py) and avoids
+# the cells that world.isXYTraversable() rules out. The informed
+# searches are given the Manhattan distance to the goal, which never
+# overestimates since moves are only ever in the four compass
+# directions.
+def findPath(world, algorithm, start, goal, *args):
+    grid = world.grid()
+    goalCell = grid.toCell(goal)
+    successors = grid.successorFunction(world.blockedCells())
+    if algorithm in informedSearches:
+        args = (grid.manhattan(goalCell),) + args
+
+    path = algorithm(grid.toCell(start), lambda cell: cell == goalCell, successors, *args)
+
+    if path is None:
+        print("Failed to find a path")
+        return []
+    if not path:
+        print("Start and end locations are the same")
+    return path
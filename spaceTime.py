@@ -0,0 +1,70 @@
+# spaceTime.py
+#
+# Planning around the Wumpus as they move, for Link in the dynamic
+# game.
+#
+# A plan made on a snapshot of the grid treats the Wumpus as if they
+# will stay where they are, and so happily walks into the cell that a
+# Wumpus is about to step into. Here we search over (cell, t) instead:
+# where Link is, and after how many ticks. A reservation table gives
+# the cells that a Wumpus may be in after each tick (worked out from
+# the rules the Wumpus move by, see threat.py), and Link can't be in a
+# reserved cell at the time it is reserved. As well as the four moves,
+# Link can wait where they are for a tick.
+#
+# The reservations only go as far as the horizon, and past it nothing
+# is reserved: the predictions have spread out too far to say where
+# the Wumpus will be, and Link will have planned again long before
+# then. With nothing to tell one tick past the horizon from the next,
+# those states are all given the time horizon + 1, so each cell can
+# only be visited at horizon + 2 different times. This keeps the
+# search no bigger than that many copies of the grid.
+#
+# Written by: Max Butler
+
+import search
+
+# Search from start for any of the cells in goals. blocked are the
+# cells that can never be entered (the pits), and reserved[t] is the
+# set of cells that can't be occupied after t ticks, for t up to
+# len(reserved) - 1, the horizon. Nothing is reserved after that. heuristic(cell) must never
+# overestimate the number of moves to the nearest goal.
+#
+# Returns the list of moves, each a direction or None for waiting, or
+# None if no goal can be reached.
+def spaceTimeSearch(grid, blocked, reserved, start, goals, heuristic):
+    horizon = len(reserved) - 1
+    neighbours = grid.neighbours
+
+    startState = (start, 0)
+    parents = {startState: None}
+    costs = {startState: 0}
+    frontier = search.PriorityFrontier()
+    frontier.push((startState, 0), (heuristic(start), heuristic(start)))
+
+    while frontier:
+        state, g = frontier.pop()
+        if g > costs[state]:
+            continue
+
+        cell, t = state
+        if cell in goals:
+            return search.recoverPlan(parents, state)
+
+        nextT = min(t + 1, horizon + 1)
+        taken = reserved[nextT] if nextT <= horizon else ()
+        childCost = g + 1
+        # Waiting is tried first, so that it wins ties with moving
+        # away and back again.
+        for direction, child in [(None, cell)] + [(direction, table[cell]) for direction, table in neighbours]:
+            if child < 0 or child in blocked or child in taken:
+                continue
+            childState = (child, nextT)
+            if childCost >= costs.get(childState, childCost + 1):
+                continue
+            costs[childState] = childCost
+            parents[childState] = (state, direction)
+            h = heuristic(child)
+            frontier.push((childState, childCost), (childCost + h, h))
+
+    return None
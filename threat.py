@@ -0,0 +1,137 @@
+# threat.py
+#
+# Where the Wumpus are likely to be over the next few ticks, in the
+# dynamic game.
+#
+# Each tick, World.updateWumpus() moves every Wumpus by the same rules:
+#
+# - if it is within config.senseDistance of Link, it takes a step
+#   towards Link (moveToLink()): along the one axis where they differ,
+#   or along either with probability 1/2 when they differ in both;
+# - otherwise it picks the x or the y axis with probability 1/2, and
+#   moves -1, 0 or +1 along it with probability 1/3 each, staying put
+#   if that would take it off the grid (makeRandomMove()).
+#
+# So if we know the probability of a Wumpus being in each cell now,
+# we can work out the probability of it being in each cell after the
+# next tick, and so on. This is a Markov chain, and one tick is a
+# handful of NumPy operations on an array holding the distribution of
+# every Wumpus at once: for each of the five moves (the four compass
+# directions and staying put), the distribution is weighted by the
+# probability of that move from each cell, and shifted over by it.
+#
+# The Wumpus move independently, so the danger of a cell, the chance
+# that at least one Wumpus is in it, is 1 minus the product of the
+# chances that each of them isn't.
+#
+# Written by: Max Butler
+
+import config
+from utils import numpy
+
+# The moves a Wumpus can make, as (dx, dy). The first is staying put.
+wumpusMoves = ((0, 0), (1, 0), (-1, 0), (0, 1), (0, -1))
+
+# The probability, for every cell (indexed [y, x]), of each of the
+# wumpusMoves being made by a Wumpus in that cell when Link is at
+# link, a Pose. Returns one array per move.
+def moveProbabilities(world, link):
+    height = world.maxY + 1
+    width = world.maxX + 1
+    ys, xs = numpy.mgrid[0:height, 0:width]
+
+    # Away from Link, moves are random. A move off the grid leaves the
+    # Wumpus where it is.
+    weights = [numpy.zeros((height, width)) for move in wumpusMoves]
+    weights[0][:] = 1 / 3
+    for weight, (dx, dy) in zip(weights[1:], wumpusMoves[1:]):
+        weight[:] = 1 / 6
+        outside = (xs + dx < 0) | (xs + dx >= width) | (ys + dy < 0) | (ys + dy >= height)
+        weight[outside] = 0
+        weights[0][outside] += 1 / 6
+
+    # Within sense distance, head for Link: half and half when both
+    # coordinates differ, all along the axis that does otherwise.
+    near = numpy.sqrt((xs - link.x) ** 2 + (ys - link.y) ** 2) < config.senseDistance
+    stepX = numpy.sign(link.x - xs)
+    stepY = numpy.sign(link.y - ys)
+    alongX = numpy.where(stepY == 0, 1.0, numpy.where(stepX == 0, 0.0, 0.5))
+    alongY = numpy.where(stepX == 0, 1.0, numpy.where(stepY == 0, 0.0, 0.5))
+    atLink = (stepX == 0) & (stepY == 0)
+    for weight, (dx, dy) in zip(weights, wumpusMoves):
+        if dx == 0 and dy == 0:
+            chase = atLink.astype(float)
+        elif dy == 0:
+            chase = alongX * (stepX == dx)
+        else:
+            chase = alongY * (stepY == dy)
+        weight[near] = chase[near]
+    return weights
+
+# Move every distribution in distributions (an array indexed [Wumpus,
+# y, x]) on by one tick, using the weights from moveProbabilities().
+def step(distributions, weights):
+    after = distributions * weights[0]
+    for weight, (dx, dy) in zip(weights[1:], wumpusMoves[1:]):
+        moved = distributions * weight
+        # What was at [y, x] ends up at [y + dy, x + dx]
+        if dx == 1:
+            after[:, :, 1:] += moved[:, :, :-1]
+        elif dx == -1:
+            after[:, :, :-1] += moved[:, :, 1:]
+        elif dy == 1:
+            after[:, 1:, :] += moved[:, :-1, :]
+        else:
+            after[:, :-1, :] += moved[:, 1:, :]
+    return after
+
+# The danger map for world: an array indexed [t, y, x] giving the
+# probability that at least one Wumpus is in each cell after t more
+# ticks, for t from 0 (now) to horizon. links gives where Link will be
+# at each tick (a list of Poses, the last one being used once it runs
+# out); by default Link stays where they are.
+#
+# A Wumpus moves at most one cell a tick, so after t ticks it can only
+# be within t cells of where it started. Rather than keeping a whole
+# grid for each Wumpus, we keep the square of side 2 * horizon + 1
+# around where it starts, and the move probabilities are copied out of
+# a padded grid into the same squares.
+def threatField(world, horizon=None, links=None):
+    if horizon is None:
+        horizon = config.threatHorizon
+    if not links:
+        links = [world.getLinkLocation()]
+    height = world.maxY + 1
+    width = world.maxX + 1
+    side = 2 * horizon + 1
+
+    # Where each Wumpus's square sits in the grid padded by horizon on
+    # every side, whose cell [y + horizon, x + horizon] is cell [y, x].
+    offsets = numpy.arange(side)
+    rows = numpy.array([loc.y for loc in world.wLoc], dtype=numpy.intp)[:, None, None] + offsets[None, :, None]
+    columns = numpy.array([loc.x for loc in world.wLoc], dtype=numpy.intp)[:, None, None] + offsets[None, None, :]
+
+    distributions = numpy.zeros((len(world.wLoc), side, side))
+    distributions[:, horizon, horizon] = 1
+
+    danger = numpy.empty((horizon + 1, height, width))
+    weights = None
+    for t in range(horizon + 1):
+        if t > 0:
+            # The rules only change when Link moves
+            if weights is None or t - 1 < len(links):
+                padded = []
+                for weight in moveProbabilities(world, links[min(t - 1, len(links) - 1)]):
+                    padded.append(numpy.pad(weight, horizon)[rows, columns])
+                weights = padded
+            distributions = step(distributions, weights)
+
+        # Multiply together the chances of each Wumpus not being in each
+        # cell, by adding up their logs.
+        safe = numpy.zeros((height + 2 * horizon, width + 2 * horizon))
+        with numpy.errstate(divide='ignore'):
+            logs = numpy.log1p(-distributions)
+        for i, loc in enumerate(world.wLoc):
+            safe[loc.y:loc.y + side, loc.x:loc.x + side] += logs[i]
+        danger[t] = 1 - numpy.exp(safe[horizon:horizon + height, horizon:horizon + width])
+    return danger
@@ -0,0 +1,149 @@
+# tour.py
+#
+# Planning a route for Link that picks up all of the gold.
+#
+# Rather than heading for whichever gold is first in the list and
+# searching again each time one is picked up, we:
+#
+# 1. work out the shortest distance between every pair of Link and the
+#    golds, from the distance field of each of them (see
+#    distanceField.py), which in a static world is only built once;
+# 2. choose the order to visit the gold in, exactly (dynamic
+#    programming over subsets, Held-Karp) when there are only a few,
+#    and otherwise with nearest insertion followed by 2-opt;
+# 3. join up the shortest paths between consecutive stops.
+#
+# The last tour is cached, so asking again for the same start, gold
+# and layout costs nothing.
+#
+# Written by: Max Butler
+
+import config
+import distanceField
+
+infinity = float('inf')
+
+# Distances between every pair of terminals (Link first, then the
+# gold), along with the distance field of each terminal so that the
+# paths can be recovered. Unreachable pairs are infinitely far apart.
+def distanceMatrix(grid, blocked, terminals):
+    fields = [distanceField.getField(grid, blocked, terminal) for terminal in terminals]
+    distances = []
+    for terminal in terminals:
+        row = []
+        for field in fields:
+            distance = field[terminal]
+            row.append(distance if distance >= 0 else infinity)
+        distances.append(row)
+    return distances, fields
+
+# The cheapest order to visit terminals 1..m in, starting at terminal
+# 0 and ending wherever is best, by dynamic programming over the
+# subsets of terminals visited so far. O(2^m m^2).
+def exactOrder(distances):
+    m = len(distances) - 1
+    full = (1 << m) - 1
+    # cost[mask][j] is the cheapest way to visit the stops in mask
+    # ending at stop j (stops numbered from 0 here, terminal j + 1).
+    cost = [[infinity] * m for mask in range(full + 1)]
+    previous = [[-1] * m for mask in range(full + 1)]
+    for j in range(m):
+        cost[1 << j][j] = distances[0][j + 1]
+
+    for mask in range(1, full + 1):
+        for j in range(m):
+            here = cost[mask][j]
+            if here == infinity or not mask & (1 << j):
+                continue
+            for k in range(m):
+                if mask & (1 << k):
+                    continue
+                nextMask = mask | (1 << k)
+                total = here + distances[j + 1][k + 1]
+                if total < cost[nextMask][k]:
+                    cost[nextMask][k] = total
+                    previous[nextMask][k] = j
+
+    last = min(range(m), key=lambda j: cost[full][j])
+    order = []
+    mask = full
+    while last >= 0:
+        order.append(last + 1)
+        last, mask = previous[mask][last], mask & ~(1 << last)
+    order.reverse()
+    return order
+
+# A good order to visit terminals 1..m in, starting at terminal 0:
+# build it by nearest insertion, then improve it with 2-opt.
+def heuristicOrder(distances):
+    m = len(distances) - 1
+    unvisited = set(range(1, m + 1))
+    order = []
+
+    while unvisited:
+        # The unvisited stop nearest to the tour so far...
+        stop = min(unvisited, key=lambda k: min(distances[i][k] for i in [0] + order))
+        unvisited.remove(stop)
+        # ...goes wherever it adds least.
+        best = None
+        for position in range(len(order) + 1):
+            before = order[position - 1] if position > 0 else 0
+            added = distances[before][stop]
+            if position < len(order):
+                after = order[position]
+                added += distances[stop][after] - distances[before][after]
+            if best is None or added < best[0]:
+                best = (added, position)
+        order.insert(best[1], stop)
+
+    # 2-opt: reverse any stretch of the tour that makes it shorter.
+    # The tour doesn't return to the start, so the end of the last
+    # stretch has nothing after it.
+    improved = True
+    while improved:
+        improved = False
+        for i in range(len(order) - 1):
+            before = order[i - 1] if i > 0 else 0
+            for j in range(i + 1, len(order)):
+                change = distances[before][order[j]] - distances[before][order[i]]
+                if j + 1 < len(order):
+                    after = order[j + 1]
+                    change += distances[order[i]][after] - distances[order[j]][after]
+                if change < 0:
+                    order[i:j + 1] = reversed(order[i:j + 1])
+                    improved = True
+    return order
+
+# The last tour that was planned, as (key, path).
+lastTour = None
+
+# Plan a path from start that visits every cell in golds, avoiding
+# blocked cells. Golds that can't be reached are left out. Returns a
+# list of directions.
+def planTour(grid, blocked, start, golds):
+    global lastTour
+    blocked = frozenset(blocked)
+    key = (grid.width, grid.height, start, tuple(golds), blocked)
+    if lastTour is not None and lastTour[0] == key:
+        return lastTour[1][:]
+
+    terminals = [start] + golds
+    distances, fields = distanceMatrix(grid, blocked, terminals)
+    reachable = [i for i in range(1, len(distances)) if distances[0][i] < infinity]
+    # Only plan over the gold we can reach
+    keep = [0] + reachable
+    distances = [[distances[i][j] for j in keep] for i in keep]
+
+    if len(reachable) <= config.exactTourLimit:
+        order = exactOrder(distances) if reachable else []
+    else:
+        order = heuristicOrder(distances)
+
+    path = []
+    previous = 0
+    for stop in order:
+        path.extend(distanceField.pathFrom(grid, fields[keep[stop]], terminals[keep[previous]]))
+        previous = stop
+
+    lastTour = (key, path)
+    return path[:]
@@ -9,9 +9,17 @@
 
 import random
 import math
-import copy
 from enum import Enum
 
+# NumPy is optional. The modules that use it import it from here, and
+# Link only calls on them when numpyAvailable is True.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+numpyAvailable = numpy is not None
+
 # Representation of directions.
 #
 # Note that NORTH is interpreted as the
@@ -112,15 +120,15 @@ def pickUniquePose(x, y, taken):
 #
 # There should be a way to do this with in/__contains__ by overloading
 # the relevant equality operator for pose, but that is for another
-# time.
+# time. poseList can also be a set of (x, y) pairs, which is checked
+# with one lookup rather than by going through every pose.
 def containedIn(pose, poseList):
-    contained = False
+    if isinstance(poseList, (set, frozenset)):
+        return (pose.x, pose.y) in poseList
     for poses in poseList:
-        if sameLocation(pose, poses):
-            contained = True
-            #print(pose, "and", poses, "are (both) at (", pose.x, ",
-            #", pose.y, ") and (", pose.x, ", ", pose.y, ")")
-    return contained
+        if poses.x == pose.x and poses.y == pose.y:
+            return True
+    return False
 
 # Print out game state information. Not so useful given
 # the graphical display, but might come in handy.
@@ -173,15 +181,12 @@ def sameLink(state1, state2):
         return False
 
 # The wumpus in two states are the same if for every wumpus in state1
-# there is a wumpus with the same location in state 2. We need to sort
-# by location to check this, and we need to create copies because sort
-# has side-effects.
+# there is a wumpus with the same location in state 2. Sorting the
+# coordinates gives the same tuple however the wumpus are ordered, so
+# we can just compare those.
 def sameWumpus(state1, state2):
-    state3 = copy.deepcopy(state1)
-    state4 = copy.deepcopy(state2)
-    state3.wLoc.sort(key=ltPose)
-    state4.wLoc.sort(key=ltPose)
-    for i in range(len(state3.wLoc)):
-        if not sameLocation(state3.wLoc[i], state4.wLoc[i]):
-            return False
-    return True
+    return canonicalWumpus(state1.wLoc) == canonicalWumpus(state2.wLoc)
+
+# An order-independent key for a list of wumpus locations.
+def canonicalWumpus(wLoc):
+    return tuple(sorted((loc.x, loc.y) for loc in wLoc))
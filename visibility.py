@@ -0,0 +1,135 @@
+# visibility.py
+#
+# What Link can see when config.partialVisibility is set, and what
+# Link knows about the world from what they have seen so far.
+#
+# Link sees a cone in the direction they last moved in (their
+# heading): up to config.forwardLimit cells ahead, and up to
+# config.sideLimit cells to either side of each of those, as well as
+# the cells to either side of Link.
+#
+# The cones are worked out once for every cell and heading. For each
+# heading there is one table per place in the cone, built like the
+# neighbour tables of grid.py, giving the cell at that place in the
+# cone of every cell (-1 if it is off the grid). Seeing is then just
+# reading one entry of each table, and what is in view is found by
+# intersecting the cells in view with the world's sets of occupied
+# cells.
+#
+# Written by: Max Butler
+
+from array import array
+from utils import Directions
+import search
+
+# The directions to the left and right of each heading.
+sides = {Directions.NORTH: (Directions.WEST, Directions.EAST),
+         Directions.SOUTH: (Directions.EAST, Directions.WEST),
+         Directions.EAST: (Directions.NORTH, Directions.SOUTH),
+         Directions.WEST: (Directions.SOUTH, Directions.NORTH)}
+
+# Follow table from every cell in cells, keeping -1 for cells that
+# have already left the grid.
+def follow(table, cells):
+    return array('i', [table[cell] if cell >= 0 else -1 for cell in cells])
+
+# For each heading, the tables for the places in the cone.
+def coneTables(grid, sideLimit, forwardLimit):
+    tables = dict(grid.neighbours)
+    cones = {}
+    for heading in sides:
+        left, right = sides[heading]
+        ahead = array('i', range(grid.size))
+        places = []
+        for forward in range(forwardLimit + 1):
+            if forward > 0:
+                ahead = follow(tables[heading], ahead)
+                places.append(ahead)
+            for side in (left, right):
+                across = ahead
+                for distance in range(sideLimit):
+                    across = follow(tables[side], across)
+                    places.append(across)
+        cones[heading] = places
+    return cones
+
+# Cones only depend on the grid and the limits, so they are built once
+# and shared. Grids are shared too (see grid.getGrid()), so the grid
+# itself can be part of the key.
+coneCache = {}
+
+def getCones(grid, sideLimit, forwardLimit):
+    key = (grid, sideLimit, forwardLimit)
+    if key not in coneCache:
+        coneCache[key] = coneTables(grid, sideLimit, forwardLimit)
+    return coneCache[key]
+
+# The cells in view from cell facing heading, including cell.
+def visibleCells(cones, cell, heading):
+    visible = {cell}
+    for place in cones[heading]:
+        seen = place[cell]
+        if seen >= 0:
+            visible.add(seen)
+    return visible
+
+# What Link knows about the world. Cells that have never been seen are
+# assumed to be empty, so Link plans straight through them and finds
+# out as they get closer.
+class KnownMap():
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.seen = bytearray(grid.size)
+        self.pits = set()
+        self.wumpus = set()
+        self.golds = set()
+
+    # Take in an observation: the cells in view and which of them have
+    # a pit, a Wumpus and gold. Pits never move, but Wumpus and gold
+    # that aren't where they were last seen are forgotten.
+    def update(self, visible, pits, wumpus, golds):
+        for cell in visible:
+            self.seen[cell] = 1
+        self.pits |= pits
+        self.wumpus -= visible
+        self.wumpus |= wumpus
+        self.golds -= visible
+        self.golds |= golds
+
+    def blocked(self):
+        return self.pits | self.wumpus
+
+    # The first move towards the nearest gold that has been seen, or if
+    # there is none that can be reached, towards the nearest cell that
+    # hasn't been seen. None if there is nowhere left to go.
+    #
+    # If belief (see belief.py) is given, the cells that are certain to
+    # lose the game are avoided, nearness allows for the risk of the
+    # cells on the way, and the cells that the glitter points to are
+    # looked at before the rest.
+    def nextMove(self, start, belief=None):
+        blocked = self.blocked()
+        if belief is None:
+            plan = lambda isGoal: search.breadthFirstSearch(start, isGoal, successors)
+        else:
+            blocked |= belief.dangerous
+            stepCost = belief.costs().__getitem__
+            plan = lambda isGoal: search.weightedSearch(start, isGoal, successors, stepCost)
+        successors = self.grid.successorFunction(blocked)
+
+        seen = self.seen
+        goals = []
+        if self.golds:
+            goals.append(lambda cell: cell in self.golds)
+        if belief is not None:
+            likely = belief.likelyGold
+            if likely:
+                goals.append(lambda cell: cell in likely and not seen[cell])
+        goals.append(lambda cell: not seen[cell])
+
+        for isGoal in goals:
+            path = plan(isGoal)
+            if path:
+                return path[0]
+        return None
@@ -0,0 +1,102 @@
+# wavefront.py
+#
+# Distances from Link to every cell of the grid at once, using NumPy.
+#
+# This is breadth first search, but a whole layer at a time: the cells
+# at distance d + 1 are the free, unvisited neighbours of the cells at
+# distance d, and each layer is worked out with a handful of array
+# operations on the cell ids in it rather than a Python loop over the
+# cells. Along with the distances we keep, for every cell, the first
+# move Link should make to get there along a shortest path, which each
+# cell takes from the cell it was reached from.
+#
+# The grid is padded with a border of blocked cells, so that moves off
+# the edge never need to be checked for.
+#
+# Written by: Max Butler
+
+import grid
+from utils import numpy
+
+# A boolean array, indexed [y, x], that is True for the cells of world
+# that can be entered, that is the ones without a pit or a Wumpus.
+def traversable(world):
+    free = numpy.ones((world.maxY + 1, world.maxX + 1), dtype=bool)
+    for loc in world.pLoc + world.wLoc:
+        free[loc.y, loc.x] = False
+    return free
+
+# Breadth first search over free (from traversable()) out from the
+# cell at source, a Pose (Link by default).
+#
+# Returns two arrays, both indexed [y, x]: the number of moves to each
+# cell (-1 if it can't be reached), and the first move to make from
+# source towards it, as an index into grid.moveOrder (-1 for source and
+# the cells that can't be reached; see firstMove()).
+def distanceTransform(world, free=None, source=None):
+    if free is None:
+        free = traversable(world)
+    if source is None:
+        source = world.getLinkLocation()
+    height, width = free.shape
+    paddedWidth = width + 2
+
+    # The cells that are free and haven't been reached yet
+    unvisited = numpy.zeros((height + 2, paddedWidth), dtype=bool)
+    unvisited[1:-1, 1:-1] = free
+    unvisited = unvisited.ravel()
+    distances = numpy.full(unvisited.size, -1, dtype=numpy.int32)
+    moves = numpy.full(unvisited.size, -1, dtype=numpy.int8)
+    # Used to pick one copy of each cell reached twice in a layer
+    claimed = numpy.zeros(unvisited.size, dtype=numpy.intp)
+
+    offsets = []
+    for direction in grid.moveOrder:
+        dx, dy = world.moveDeltas[direction]
+        offsets.append(dx + dy * paddedWidth)
+    offsets = numpy.array(offsets, dtype=numpy.intp)
+    numberOfMoves = len(offsets)
+
+    start = (source.y + 1) * paddedWidth + source.x + 1
+    distances[start] = 0
+    unvisited[start] = False
+    frontier = numpy.array([start], dtype=numpy.intp)
+    frontierMoves = None
+    distance = 0
+
+    while frontier.size:
+        distance += 1
+        # Every move from every cell in the layer
+        reached = (frontier[:, None] + offsets).ravel()
+        if frontierMoves is None:
+            # The first layer is reached by the moves themselves
+            inherited = numpy.arange(numberOfMoves, dtype=numpy.int8)
+        else:
+            inherited = numpy.repeat(frontierMoves, numberOfMoves)
+        keep = unvisited[reached]
+        reached = reached[keep]
+        inherited = inherited[keep]
+
+        # A cell can be reached from more than one cell in the layer.
+        # Each copy writes its position into claimed, and only the copy
+        # whose write is still there afterwards is kept.
+        positions = numpy.arange(reached.size)
+        claimed[reached] = positions
+        keep = claimed[reached] == positions
+        frontier = reached[keep]
+        frontierMoves = inherited[keep]
+
+        unvisited[frontier] = False
+        distances[frontier] = distance
+        moves[frontier] = frontierMoves
+
+    shape = (height + 2, paddedWidth)
+    return distances.reshape(shape)[1:-1, 1:-1], moves.reshape(shape)[1:-1, 1:-1]
+
+# The direction that a move index from distanceTransform() stands for,
+# or None.
+def firstMove(moves, loc):
+    move = moves[loc.y, loc.x]
+    if move < 0:
+        return None
+    return grid.moveOrder[move]
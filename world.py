@@ -8,8 +8,11 @@
 # Last Modified: 25/08/20
 
 import random
+from array import array
 import config
 import utils
+import grid
+import visibility
 from utils import Pose
 from utils import Directions
 from utils import State
@@ -17,6 +20,13 @@ from location import Location
 
 class World():
 
+    # How each move changes the x and y coordinates. NORTH is the
+    # direction of increasing y, as in updateLink().
+    moveDeltas = {Directions.NORTH: (0, 1),
+                  Directions.SOUTH: (0, -1),
+                  Directions.EAST:  (1, 0),
+                  Directions.WEST:  (-1, 0)}
+
     def __init__(self):
 
         # Import boundaries of the world. because we index from 0,
@@ -24,40 +34,53 @@ class World():
         self.maxX = config.worldLength - 1
         self.maxY = config.worldBreadth - 1
 
-        # Keep a list of locations that have been used.
+        # Keep a list of locations that have been used, and a set of
+        # them so that picking a new one doesn't have to go through the
+        # list.
         self.locationList = []
+        self.takenCells = set()
 
         # Wumpus locations within the world
         self.wLoc = []
         for i in range(config.numberOfWumpus):
-            newLoc = utils.pickUniquePose(self.maxX, self.maxY, self.locationList)
+            newLoc = utils.pickUniquePose(self.maxX, self.maxY, self.takenCells)
             self.wLoc.append(newLoc)
             self.locationList.append(newLoc)
+            self.takenCells.add((newLoc.x, newLoc.y))
 
         # Link location
-        newLoc = utils.pickUniquePose(self.maxX, self.maxY, self.locationList)
+        newLoc = utils.pickUniquePose(self.maxX, self.maxY, self.takenCells)
         self.lLoc = newLoc
         self.locationList.append(newLoc)
+        self.takenCells.add((newLoc.x, newLoc.y))
 
         # Gold location
         self.gLoc = []
         for i in range(config.numberOfGold):
-            newLoc = utils.pickUniquePose(self.maxX, self.maxY, self.locationList)
+            newLoc = utils.pickUniquePose(self.maxX, self.maxY, self.takenCells)
             self.gLoc.append(newLoc)
             self.locationList.append(newLoc)
+            self.takenCells.add((newLoc.x, newLoc.y))
 
         # Pit locations
         self.pLoc = []
         for i in range(config.numberOfPits):
-            newLoc = utils.pickUniquePose(self.maxX, self.maxY, self.locationList)
+            newLoc = utils.pickUniquePose(self.maxX, self.maxY, self.takenCells)
             self.pLoc.append(newLoc)
             self.locationList.append(newLoc)
+            self.takenCells.add((newLoc.x, newLoc.y))
 
         # Game state
         self.status = State.PLAY
 
         # Did Link just successfully loot some gold?
         self.looted = False
+
+        # Indexes of where everything is
+        self.updateOccupancy()
+
+        # Which way Link is facing, the direction they last moved in
+        self.heading = Directions.NORTH
         
     #
     # Access Methods
@@ -100,10 +123,7 @@ class World():
         return self.status
     
     def isLinkAtGoldLocation(self):
-        for i in range(len(self.gLoc)):
-            if utils.sameLocation(self.lLoc, self.gLoc[i]):
-                return True
-        return False
+        return self.cellOf(self.lLoc) in self.goldCells
 
     #
     # Methods
@@ -115,19 +135,18 @@ class World():
     def isEnded(self):
         dead = False
         won = False
+        linkCell = self.cellOf(self.lLoc)
         # Has Link met the Wumpus?
-        for i in range(len(self.wLoc)):
-            if utils.sameLocation(self.lLoc, self.wLoc[i]):
-                print("Oops! Met the Wumpus at [", self.lLoc.x, ',', self.lLoc.y, "]")
-                dead = True
-                self.status = State.LOST
+        if linkCell in self.wumpusCells:
+            print("Oops! Met the Wumpus at [", self.lLoc.x, ',', self.lLoc.y, "]")
+            dead = True
+            self.status = State.LOST
                 
         # Did Link fall in a Pit?
-        for i in range(len(self.pLoc)):
-            if utils.sameLocation(self.lLoc, self.pLoc[i]):
-                print("Arghhhhh! Fell in a pit at [", self.lLoc.x, ',', self.lLoc.y, "]")
-                dead = True
-                self.status = State.LOST
+        if linkCell in self.pitCells:
+            print("Arghhhhh! Fell in a pit at [", self.lLoc.x, ',', self.lLoc.y, "]")
+            dead = True
+            self.status = State.LOST
 
         # Did Link loot all the gold?
         if len(self.gLoc) == 0:
@@ -144,6 +163,8 @@ class World():
         self.looted = False
         # Implement non-determinism if appropriate
         direction = self.probabilisticMotion(direction)
+        if isinstance(direction, Directions):
+            self.heading = direction
         if direction == Directions.NORTH:
             if self.lLoc.y < self.maxY:
                 self.lLoc.y = self.lLoc.y + 1
@@ -160,20 +181,13 @@ class World():
             if self.lLoc.x > 0:
                 self.lLoc.x = self.lLoc.x - 1
 
-        # Did Link just loot some gold?
-        match = False
-        index = 0
-        for i in range(len(self.gLoc)):
-            if utils.sameLocation(self.lLoc, self.gLoc[i]):
-                match = True
-                index = i
-                self.looted = True
-                print("Gold, yeah!")
-
-        # Assumes that golds have different locations. Or, that only
-        # one gold can be picked up in a given turn.
-        if match:
-            self.gLoc.pop(index)
+        # Did Link just loot some gold? Golds have different
+        # locations, so only one can be picked up in a given turn.
+        linkCell = self.cellOf(self.lLoc)
+        if linkCell in self.goldCells:
+            self.looted = True
+            print("Gold, yeah!")
+            self.removeGold(linkCell)
 
     # Implement nondeterministic motion, if appropriate. This is not
     # really used at the moment.
@@ -230,6 +244,7 @@ class World():
                     self.moveToLink(i)
                 else:
                     self.makeRandomMove(i)
+            self.updateWumpusOccupancy()
 
     # Head towards Link 
     def moveToLink(self, i):
@@ -279,82 +294,171 @@ class World():
     # can Link enter the provided x,y position?
     def isXYTraversable(self, x, y):
         # Check if the location is within bounds of the grid
-        if not self.isTraversable(utils.Pose(x, y)):
+        if not (0 <= x <= self.maxX and 0 <= y <= self.maxY):
             return False
-        
-        # checks if the location has a Wumpus
-        wumpus_locations = self.getWumpusLocation()  # Assuming this method gives the locations of Wumpus
-        for wumpus_loc in wumpus_locations:
-            if wumpus_loc.x == x and wumpus_loc.y == y:
-                return False
-        
-        # checks if the location has a pit
-        pit_locations = self.getPitsLocation()  # Assuming this method gives the locations of pits
-        for pit_loc in pit_locations:
-            if pit_loc.x == x and pit_loc.y == y:
-                return False
-        
-        # If none of the above checks fail, then the location is traversable
-        return True
+
+        # and then that there is no Wumpus or pit there
+        cell = y * (self.maxX + 1) + x
+        return cell not in self.pitCells and cell not in self.wumpusCells
             
     # returns the actions that can be taken from the provided location
+    #
+    # The moves are looked up in moveDeltas so that a subclass that
+    # moves in a different direction for NORTH and SOUTH (like the
+    # puzzle) gets actions that match how it moves.
     def getActions(self, location):
         possibleMoves = []
-        
-        if self.isXYTraversable(location.x + 1, location.y):
-            possibleMoves.append(  Directions.EAST )
-             
-        if self.isXYTraversable(location.x - 1, location.y):
-            possibleMoves.append( Directions.WEST )
-        
-        if self.isXYTraversable(location.x, location.y + 1):
-            possibleMoves.append( Directions.NORTH )
-        
-        if self.isXYTraversable(location.x, location.y - 1):
-            possibleMoves.append( Directions.SOUTH )
-            
+
+        for direction in (Directions.EAST, Directions.WEST, Directions.NORTH, Directions.SOUTH):
+            dx, dy = self.moveDeltas[direction]
+            if self.isXYTraversable(location.x + dx, location.y + dy):
+                possibleMoves.append(direction)
+
         return possibleMoves
 
+    #
+    # Occupancy
+    #
+    # As well as the lists of locations, the world keeps indexes from
+    # cell (y * width + x, the same numbering as grid.py) to what is
+    # there, so that collision, loot and traversability checks are one
+    # lookup however many pits, Wumpus and gold there are:
+    #
+    # - pitCells, the set of cells with a pit;
+    # - wumpusCells, how many Wumpus are in each cell (they can share);
+    # - goldCells, where in gLoc the gold in each cell is.
+    #
+    # These replace bitboards (one Python integer per kind of thing,
+    # with a bit for each cell), which were kept here before. Testing
+    # or changing one bit of a Python integer makes a new integer as
+    # long as the whole board, so every check cost time in proportion
+    # to the number of cells, and rebuilding the Wumpus board took most
+    # of a tick on a 1000 x 1000 grid. A set or dict lookup doesn't
+    # depend on the size of the grid.
+    #
+    # For the percepts, there are also counts for every cell of how
+    # many of its neighbours hold a pit (breezeCounts), a Wumpus
+    # (stenchCounts) and gold (glitterCounts), so that a percept is a
+    # single lookup too. These only change around the things that move
+    # or are taken.
+    #
+    # updateLink(), updateWumpus() and the puzzle's takeStep() keep all
+    # of them up to date.
+
+    def cellOf(self, loc):
+        return loc.y * (self.maxX + 1) + loc.x
+
+    def updateOccupancy(self):
+        self.pitCells = {self.cellOf(loc) for loc in self.pLoc}
+        self.goldCells = {self.cellOf(loc): i for i, loc in enumerate(self.gLoc)}
+
+        self.neighbourTables = [table for direction, table in self.grid().neighbours]
+        size = (self.maxX + 1) * (self.maxY + 1)
+        self.breezeCounts = array('i', [0]) * size
+        self.glitterCounts = array('i', [0]) * size
+        self.stenchCounts = array('i', [0]) * size
+        for cell in self.pitCells:
+            self.countAround(self.breezeCounts, cell, 1)
+        for cell in self.goldCells:
+            self.countAround(self.glitterCounts, cell, 1)
+
+        self.wumpusCells = {}
+        self.updateWumpusOccupancy()
+
+    # Add change to the counts of the neighbours of cell.
+    def countAround(self, counts, cell, change):
+        for table in self.neighbourTables:
+            neighbour = table[cell]
+            if neighbour >= 0:
+                counts[neighbour] += change
+
+    # The Wumpus can share cells, so the indexes are rebuilt from the
+    # list after they move, rather than moved one Wumpus at a time. The
+    # stench only changes around the cells whose number of Wumpus has
+    # changed.
+    def updateWumpusOccupancy(self):
+        previous = self.wumpusCells
+        self.wumpusCells = {}
+        for loc in self.wLoc:
+            cell = self.cellOf(loc)
+            self.wumpusCells[cell] = self.wumpusCells.get(cell, 0) + 1
+        for cell in previous.keys() | self.wumpusCells.keys():
+            change = self.wumpusCells.get(cell, 0) - previous.get(cell, 0)
+            if change:
+                self.countAround(self.stenchCounts, cell, change)
+
+    # Take the gold in cell out of the world. The last gold in the list
+    # is moved into its place, so that nothing else in the list has to
+    # move.
+    def removeGold(self, cell):
+        index = self.goldCells.pop(cell)
+        last = self.gLoc.pop()
+        if index < len(self.gLoc):
+            self.gLoc[index] = last
+            self.goldCells[self.cellOf(last)] = index
+        self.countAround(self.glitterCounts, cell, -1)
+
+    #
+    # Partial visibility
+    #
+    # What Link can see from where they are, facing the way they last
+    # moved (see visibility.py).
+
+    def visibleCells(self):
+        cones = visibility.getCones(self.grid(), config.sideLimit, config.forwardLimit)
+        return visibility.visibleCells(cones, self.cellOf(self.lLoc), self.heading)
+
+    # The cells in view, and which of them have a pit, a Wumpus and
+    # gold.
+    def observe(self):
+        visible = self.visibleCells()
+        return visible, self.pitCells & visible, visible.intersection(self.wumpusCells), visible.intersection(self.goldCells)
+
+    # The grid that the planners search over (see grid.py).
+    def grid(self):
+        return grid.getGrid(self.maxX + 1, self.maxY + 1, self.moveDeltas)
 
-    '''
+    # The cells of the grid that isXYTraversable() rules out.
+    def blockedCells(self):
+        return frozenset(self.pitCells.union(self.wumpusCells))
+
+
+    #
+    # Percepts
+    #
     # Some additional information about the world which may be useful
-    # for planning how to move Link.
-    
+    # for planning how to move Link when they can't see everything. A
+    # location is windy if it is next to a pit, smelly if it is next to
+    # a Wumpus, and glitters if it is next to gold. Each is a lookup in
+    # the counts kept with the occupancy indexes.
+
     # Is the given location smelly?
-    #
-    # A location is smelly if it is next to the Wumpus
-    #def isSmelly(self, location):
-        #if isAjacent(self.Wloc, location):
-            return True
-        #else:
-            return False
+    def isSmelly(self, location):
+        return self.stenchCounts[self.cellOf(location)] > 0
 
-    # Is the given location windy? 
-    #def isWindy(self, location):
-       # if isAjacent(self.ploc, location):
-            return True
-        #else:
-            return False
+    # Is the given location windy?
+    def isWindy(self, location):
+        return self.breezeCounts[self.cellOf(location)] > 0
+
+    # Does the given location glitter?
+    def isGlitter(self, location):
+        return self.glitterCounts[self.cellOf(location)] > 0
 
-     # Does the given location glitter? 
-    #def isGlitter(self, location):
-       # if isAjacent(self.gloc, location):
-            return True
-       # else:
-            return False
-    
     # Does Link feel the wind?
-    #def linkWindy(self):
-        return isWindy(lLoc)
+    def linkWindy(self):
+        return self.isWindy(self.lLoc)
 
     # Does Link smell the Wumpus?
-    #def linkSmelly(self):
-        return isSmelly(lLoc)
+    def linkSmelly(self):
+        return self.isSmelly(self.lLoc)
 
     # Does Link see the glitter?
-    #def linkGlitter(self):
-        return isGlitter(lLoc)
-    '''
+    def linkGlitter(self):
+        return self.isGlitter(self.lLoc)
+
+    # Everything Link senses where they are: (windy, smelly, glitter).
+    def percepts(self):
+        return self.linkWindy(), self.linkSmelly(), self.linkGlitter()
     
     # Is the location loc next to any of the locations in locList.
     #
@@ -362,19 +466,17 @@ class World():
     # x coordinate and have a y coordinate that differs by 1, or in
     # the same y coordinate and have an x coordinate that differs by
     # one.
-    def isAjacent(locList, loc):
+    #
+    # This goes through the whole list, so the percepts above use the
+    # counts instead.
+    def isAjacent(self, locList, loc):
         for aloc in locList:
             # Ajacency holds if it holds for any location in locList.
             if aloc.x == loc.x:
                 if aloc.y == loc.y + 1 or aloc.y == loc.y - 1:
                     return True
-                else:
-                    return False
             elif aloc.y == loc.y:
                 if aloc.x == loc.x + 1 or aloc.x == loc.x - 1:
                     return True
-                else:
-                    return False
-            else:
-                return False
+        return False
             
@@ -12,11 +12,10 @@
 # This borrows from:
 # https://www.geeksforgeeks.org/command-line-arguments-in-python/
 
-import puzzle
+import batch
 import getopt
 import random
 import config
-import game
 import sys
 
 #
@@ -29,6 +28,8 @@ def displayHelp():
     print("-p : runs the puzzle version of the wumpus world")
     print("-d : do not use the graphics (ie run headless)")
     print("-n <number> : runs either the -p or the -g version <number> of times. Note that <number> should be an integer")
+    print("-b : runs the <number> times in parallel without the graphics, and reports on them all together")
+    print("-j <number> : the number of processes to use with -b (the default is one for each core)")
 
 def main():
     # Seed the random number generator.
@@ -42,17 +43,19 @@ def main():
     # Set global flags to help parse the command line arguments
     wType = "none"
     count = 1
+    inBatch = False
+    workers = None
     
     # Drop the filename from the list of command line arguments
     argList = sys.argv[1:]
 
     # We support a help option, running either the game version or the
     # puzzle version, running with no display, and possiblly running n
-    # iterations.
-    options = "hgpdn:"
+    # iterations, either one after another or all together in a batch.
+    options = "hgpdn:bj:"
 
     # Long options
-    long_options = ["Help", "Game", "Puzzle", "Headless", "Number"]
+    long_options = ["Help", "Game", "Puzzle", "Headless", "Number", "Batch", "Jobs"]
 
     try:
         # Parsing argument
@@ -76,16 +79,29 @@ def main():
             elif currentArgument in ("-n", "--Number"):
                 count = int(currentValue)
                 print(currentValue)
+
+            elif currentArgument in ("-b", "--Batch"):
+                inBatch = True
+
+            elif currentArgument in ("-j", "--Jobs"):
+                workers = int(currentValue)
                 
     except getopt.error as err:
         # output error, and return with an error code
         print (str(err))
     
     if wType != "none":
-        if wType == "game":
+        # The game and the puzzle bring in the graphics, which need a
+        # display, so they are only imported when they are going to
+        # be shown. Batches can then run on machines without one.
+        if inBatch:
+            batch.main(wType, count, workers)
+        elif wType == "game":
+            import game
             for i in range(count):
                 game.main()
         elif wType == "puzzle":
+            import puzzle
             for i in range(count):
                 puzzle.main()            
         